@@ -3,93 +3,229 @@ Logic component templates.
 
 Handles Router, Merge, FieldSelector, and other logic node types.
 """
+import operator
 
-from typing import Dict, Any, List, Union
-from dspy_forge.core.templates import NodeTemplate, CodeGenerationContext
+from collections import OrderedDict
+from functools import lru_cache, partial
+from typing import Dict, Any, List, Union, Tuple, Callable, Optional
+from dspy_forge.core.templates import NodeTemplate, CodeGenerationContext, GeneratedCode
 from dspy_forge.core.dspy_types import DSPyLogicType
 from dspy_forge.core.logging import get_logger
 from dspy_forge.models.workflow import ComparisonOperator
 
 logger = get_logger(__name__)
 
+
+def _membership(field_value: Any, compare_value: Any) -> bool:
+    """Membership test for the `in` operator - collections by element, otherwise by substring"""
+    if isinstance(compare_value, (list, tuple, set)):
+        return operator.contains(compare_value, field_value)
+    return operator.contains(str(compare_value), str(field_value))
+
+
+# Comparison dispatch table keyed by ComparisonOperator value
+_OPS: Dict[str, Callable[[Any, Any], bool]] = {
+    "==": operator.eq,
+    "!=": operator.ne,
+    ">": lambda field_value, compare_value: float(field_value) > float(compare_value),
+    "<": lambda field_value, compare_value: float(field_value) < float(compare_value),
+    ">=": lambda field_value, compare_value: float(field_value) >= float(compare_value),
+    "<=": lambda field_value, compare_value: float(field_value) <= float(compare_value),
+    "contains": lambda field_value, compare_value: operator.contains(str(field_value), str(compare_value)),
+    "not_contains": lambda field_value, compare_value: not operator.contains(str(field_value), str(compare_value)),
+    "in": _membership,
+    "not_in": lambda field_value, compare_value: not _membership(field_value, compare_value),
+    "startswith": lambda field_value, compare_value: str(field_value).startswith(str(compare_value)),
+    "endswith": lambda field_value, compare_value: str(field_value).endswith(str(compare_value)),
+    # Truthiness already covers None, 0, False and empty str/list/dict
+    "is_empty": lambda field_value, compare_value: not field_value,
+    "is_not_empty": lambda field_value, compare_value: bool(field_value),
+}
+
+# Numeric comparisons whose constant compare value can be converted once up front
+_NUMERIC_OPS: Dict[str, Callable[[float, float], bool]] = {
+    ">": operator.gt,
+    "<": operator.lt,
+    ">=": operator.ge,
+    "<=": operator.le,
+}
+
+# String comparisons taking (compare text, field value), for a pre-stringified constant
+_STRING_OPS: Dict[str, Callable[[str, Any], bool]] = {
+    "contains": lambda compare_text, field_value: compare_text in str(field_value),
+    "not_contains": lambda compare_text, field_value: compare_text not in str(field_value),
+    "startswith": lambda compare_text, field_value: str(field_value).startswith(compare_text),
+    "endswith": lambda compare_text, field_value: str(field_value).endswith(compare_text),
+}
+
+# Generated-code templates per operator: {f} field name, {v} value literal, {raw} value as-is
+_FMT: Dict[str, str] = {
+    "==": "{f} == {v}",
+    "!=": "{f} != {v}",
+    ">": "{f} > {raw}",
+    "<": "{f} < {raw}",
+    ">=": "{f} >= {raw}",
+    "<=": "{f} <= {raw}",
+    "contains": "{v} in str({f})",
+    "not_contains": "{v} not in str({f})",
+    "in": "{f} in {v}",
+    "not_in": "{f} not in {v}",
+    "startswith": "str({f}).startswith({v})",
+    "endswith": "str({f}).endswith({v})",
+    "is_empty": "not {f}",
+    "is_not_empty": "bool({f})",
+}
+
+
+@lru_cache(maxsize=4096, typed=True)
+def _cached_literal(value: Any) -> str:
+    """Memoized repr for hashable scalar values"""
+    return repr(value)
+
+
+def _lit(value: Any) -> str:
+    """Python literal for a compare value in generated code"""
+    if type(value) in (str, int, float, bool):
+        return _cached_literal(value)
+    return repr(value)
+
+
+# Collections at least this long are matched through a frozenset instead of a linear scan
+_SET_MEMBERSHIP_MIN_SIZE = 8
+
+# Field value types whose equality implies identical routing; other values (e.g. 0.0 and -0.0,
+# which compare equal but stringify differently) are always evaluated afresh
+_ROUTE_CACHEABLE_TYPES = frozenset((str, int, bool, type(None)))
+
+
 class BaseLogicTemplate(NodeTemplate):
     """Base template for logic nodes"""
 
+    __slots__ = ()
+
     def _safe_evaluate_operator(self, field_value: Any, operator: str, compare_value: Any) -> bool:
         """Safely evaluate a single operator comparison"""
+        compare = _OPS.get(operator)
+        if compare is None:
+            logger.warning(f"Unknown operator: {operator}, defaulting to True")
+            return True
+
         try:
-            if operator == "==":
-                return field_value == compare_value
-            elif operator == "!=":
-                return field_value != compare_value
-            elif operator == ">":
-                return float(field_value) > float(compare_value)
-            elif operator == "<":
-                return float(field_value) < float(compare_value)
-            elif operator == ">=":
-                return float(field_value) >= float(compare_value)
-            elif operator == "<=":
-                return float(field_value) <= float(compare_value)
-            elif operator == "contains":
-                return str(compare_value) in str(field_value)
-            elif operator == "not_contains":
-                return str(compare_value) not in str(field_value)
-            elif operator == "in":
-                if isinstance(compare_value, (list, tuple, set)):
-                    return field_value in compare_value
-                return str(field_value) in str(compare_value)
-            elif operator == "not_in":
-                if isinstance(compare_value, (list, tuple, set)):
-                    return field_value not in compare_value
-                return str(field_value) not in str(compare_value)
-            elif operator == "startswith":
-                return str(field_value).startswith(str(compare_value))
-            elif operator == "endswith":
-                return str(field_value).endswith(str(compare_value))
-            elif operator == "is_empty":
-                return not field_value or (isinstance(field_value, (list, dict, str)) and len(field_value) == 0)
-            elif operator == "is_not_empty":
-                return bool(field_value) and (not isinstance(field_value, (list, dict, str)) or len(field_value) > 0)
-            else:
-                logger.warning(f"Unknown operator: {operator}, defaulting to True")
-                return True
+            return compare(field_value, compare_value)
         except Exception as e:
             logger.warning(f"Error evaluating condition: {e}, defaulting to True")
             return True
 
-    def _evaluate_structured_conditions(self, conditions: List[Dict[str, Any]], inputs: Dict[str, Any]) -> bool:
-        """Evaluate structured conditions safely"""
+    def _compile_operator(self, operator_name: str, compare_value: Any) -> Callable[[Any], bool]:
+        """Compile a single comparison, defaulting to True on errors like _safe_evaluate_operator"""
+        check = self._bind_operator(operator_name, compare_value)
+
+        def guarded_check(field_value: Any) -> bool:
+            try:
+                return check(field_value)
+            except Exception as e:
+                logger.warning(f"Error evaluating condition: {e}, defaulting to True")
+                return True
+
+        return guarded_check
+
+    def _bind_operator(self, operator_name: str, compare_value: Any) -> Callable[[Any], bool]:
+        """Bind a single comparison to its constant compare value, converting it once where possible"""
+        if operator_name in _NUMERIC_OPS:
+            try:
+                numeric_value = float(compare_value)
+            except Exception:
+                # e.g. OverflowError for huge ints - evaluate generically instead
+                numeric_value = None
+
+            if numeric_value is not None:
+                compare = _NUMERIC_OPS[operator_name]
+                return lambda field_value: compare(float(field_value), numeric_value)
+
+        elif operator_name in _STRING_OPS:
+            # Constant compare side is stringified once; only the field value is coerced per call
+            return partial(_STRING_OPS[operator_name], str(compare_value))
+
+        elif operator_name in ("in", "not_in"):
+            negate = operator_name == "not_in"
+
+            if not isinstance(compare_value, (list, tuple, set)):
+                # Substring membership against a constant string
+                compare_text = str(compare_value)
+                return lambda field_value: (str(field_value) in compare_text) != negate
+
+            members = None
+            if len(compare_value) >= _SET_MEMBERSHIP_MIN_SIZE:
+                try:
+                    members = frozenset(compare_value)
+                except TypeError:
+                    members = None
+
+            if members is None:
+                # Short or unhashable collections - a tuple scan is as fast as hashing
+                candidates = tuple(compare_value)
+                return lambda field_value: (field_value in candidates) != negate
+
+            def check_membership(field_value: Any) -> bool:
+                try:
+                    found = field_value in members
+                except TypeError:
+                    # Unhashable field value - fall back to equality scan
+                    found = field_value in compare_value
+                return found != negate
+
+            return check_membership
+
+        # Constant could not be pre-converted; evaluate generically
+        evaluate = self._safe_evaluate_operator
+        return lambda field_value: evaluate(field_value, operator_name, compare_value)
+
+    def _compile_conditions(self, conditions: List[Dict[str, Any]]) -> Callable[[Dict[str, Any]], bool]:
+        """Pre-resolve structured conditions into a predicate over inputs"""
         if not conditions:
-            return True
+            return lambda inputs: True
+
+        compiled = [
+            (
+                condition.get('field', ''),
+                self._compile_operator(condition.get('operator', '=='), condition.get('value')),
+                condition.get('logical_op')
+            )
+            for condition in conditions
+        ]
 
-        result = True
-        current_logical_op = None
+        def predicate(inputs: Dict[str, Any]) -> bool:
+            result = True
+            current_logical_op = None
 
-        for condition in conditions:
-            field_name = condition.get('field', '')
-            operator = condition.get('operator', '==')
-            compare_value = condition.get('value')
-            logical_op = condition.get('logical_op')
+            for field_name, check, logical_op in compiled:
+                # Combine with previous result using logical operator, skipping
+                # evaluation when the previous result already decides it
+                if current_logical_op == 'AND':
+                    if result:
+                        result = check(inputs.get(field_name))
+                elif current_logical_op == 'OR':
+                    if not result:
+                        result = check(inputs.get(field_name))
+                else:
+                    # First condition
+                    result = check(inputs.get(field_name))
 
-            # Get field value from inputs
-            field_value = inputs.get(field_name)
+                # Set logical operator for next iteration
+                current_logical_op = logical_op
 
-            # Evaluate this condition
-            condition_result = self._safe_evaluate_operator(field_value, operator, compare_value)
+            return result
 
-            # Combine with previous result using logical operator
-            if current_logical_op == 'AND':
-                result = result and condition_result
-            elif current_logical_op == 'OR':
-                result = result or condition_result
-            else:
-                # First condition
-                result = condition_result
+        return predicate
 
-            # Set logical operator for next iteration
-            current_logical_op = logical_op
+    def _evaluate_structured_conditions(self, conditions: List[Dict[str, Any]], inputs: Dict[str, Any]) -> bool:
+        """Evaluate structured conditions safely"""
+        return self._compile_conditions(conditions)(inputs)
 
-        return result
+    def evaluate_batch(self, conditions: List[Dict[str, Any]], batch: List[Dict[str, Any]]) -> List[bool]:
+        """Evaluate structured conditions against many inputs, compiling them only once"""
+        predicate = self._compile_conditions(conditions)
+        return [predicate(inputs) for inputs in batch]
 
     def _evaluate_condition(self, condition_config: Dict[str, Any], inputs: Dict[str, Any]) -> bool:
         """Evaluate condition using structured format only"""
@@ -107,31 +243,67 @@ class BaseLogicTemplate(NodeTemplate):
 class RouterTemplate(BaseLogicTemplate):
     """Template for Router logic nodes with multiple branches"""
 
-    def initialize(self, context: Any):
-        """Return self to provide call/acall interface"""
-        return self
+    # Branch predicates resolved in initialize and read on every call
+    __slots__ = ('_compiled_branches', '_default_id', '_referenced_fields', '_route_cache')
 
-    def call(self, **inputs) -> Dict[str, Any]:
-        """Synchronous execution - evaluate branches in order and route to first match"""
-        router_config = self.node_data.get('router_config', {})
-        branches = router_config.get('branches', [])
+    # Number of distinct input fingerprints remembered per router
+    _ROUTE_CACHE_SIZE = 128
 
-        matched_branch = None
-        default_branch = None
+    def initialize(self, context: Any):
+        """Resolve branch conditions once and return self to provide call/acall interface"""
+        self._default_id: Optional[str] = None
+        self._compiled_branches: List[Tuple[str, Callable[[Dict[str, Any]], bool]]] = []
+        referenced_fields = []
 
-        # Evaluate each branch in order
-        for branch in branches:
+        router_config = self.node_data.get('router_config', {})
+        for branch in router_config.get('branches', []):
             if branch.get('is_default', False):
-                default_branch = branch.get('branch_id', 'default')
+                self._default_id = branch.get('branch_id', 'default')
                 continue
 
             condition_config = branch.get('condition_config', {})
-            if self._evaluate_condition(condition_config, inputs):
-                matched_branch = branch.get('branch_id')
-                break
+            conditions = condition_config.get('structured_conditions', []) if isinstance(condition_config, dict) else []
+            for condition in conditions:
+                field_name = condition.get('field', '')
+                if field_name not in referenced_fields:
+                    referenced_fields.append(field_name)
+
+            self._compiled_branches.append((branch.get('branch_id'), self._compile_conditions(conditions)))
+
+        # Routing depends only on the referenced fields, so their values fingerprint the decision
+        self._referenced_fields: Tuple[str, ...] = tuple(referenced_fields)
+        self._route_cache: "OrderedDict[tuple, Optional[str]]" = OrderedDict()
+        return self
+
+    def _match_branch(self, inputs: Dict[str, Any]) -> Optional[str]:
+        """Evaluate branches in order and return the first matching branch id"""
+        for branch_id, condition_fn in self._compiled_branches:
+            if condition_fn(inputs):
+                return branch_id
+        return None
+
+    def call(self, **inputs) -> Dict[str, Any]:
+        """Synchronous execution - evaluate branches in order and route to first match"""
+        values = tuple(map(inputs.get, self._referenced_fields))
+
+        if all(type(value) in _ROUTE_CACHEABLE_TYPES for value in values):
+            # Include value types: 1 and True compare equal but stringify differently
+            fingerprint = tuple((type(value), value) for value in values)
+            route_cache = self._route_cache
+            try:
+                matched_branch = route_cache[fingerprint]
+                route_cache.move_to_end(fingerprint)
+            except KeyError:
+                matched_branch = self._match_branch(inputs)
+                route_cache[fingerprint] = matched_branch
+                if len(route_cache) > self._ROUTE_CACHE_SIZE:
+                    route_cache.popitem(last=False)
+        else:
+            # Floats, collections and other values - evaluate without caching
+            matched_branch = self._match_branch(inputs)
 
         # Use matched branch or fall back to default
-        selected_branch = matched_branch or default_branch or 'default'
+        selected_branch = matched_branch or self._default_id or 'default'
 
         return {
             'branch': selected_branch,
@@ -143,7 +315,7 @@ class RouterTemplate(BaseLogicTemplate):
         """Async execution - logic is sync anyway"""
         return self.call(**inputs)
 
-    def generate_code(self, context: CodeGenerationContext) -> Dict[str, Any]:
+    def generate_code(self, context: CodeGenerationContext) -> GeneratedCode:
         """Generate code for Router logic node - returns empty as router is handled specially in compiler"""
         instance_var = f"router_{context.get_node_count('router')}"
 
@@ -151,13 +323,13 @@ class RouterTemplate(BaseLogicTemplate):
 
         # Router nodes are handled specially in compiler_service.py
         # They generate if-elif-else blocks wrapping branch node code
-        return {
-            'signature': '',
-            'instance': '',
-            'forward': '',
-            'dependencies': [],
-            'instance_var': instance_var
-        }
+        return GeneratedCode(
+            signature='',
+            instance='',
+            forward='',
+            dependencies=[],
+            instance_var=instance_var
+        )
 
     def _generate_condition_expression(self, conditions: List[Dict[str, Any]]) -> str:
         """Generate Python boolean expression from structured conditions"""
@@ -172,36 +344,11 @@ class RouterTemplate(BaseLogicTemplate):
             logical_op = condition.get('logical_op')
 
             # Generate comparison expression
-            if operator == "==":
-                comp_expr = f"{field} == {repr(value)}"
-            elif operator == "!=":
-                comp_expr = f"{field} != {repr(value)}"
-            elif operator == ">":
-                comp_expr = f"{field} > {value}"
-            elif operator == "<":
-                comp_expr = f"{field} < {value}"
-            elif operator == ">=":
-                comp_expr = f"{field} >= {value}"
-            elif operator == "<=":
-                comp_expr = f"{field} <= {value}"
-            elif operator == "contains":
-                comp_expr = f"{repr(value)} in str({field})"
-            elif operator == "not_contains":
-                comp_expr = f"{repr(value)} not in str({field})"
-            elif operator == "in":
-                comp_expr = f"{field} in {repr(value)}"
-            elif operator == "not_in":
-                comp_expr = f"{field} not in {repr(value)}"
-            elif operator == "startswith":
-                comp_expr = f"str({field}).startswith({repr(value)})"
-            elif operator == "endswith":
-                comp_expr = f"str({field}).endswith({repr(value)})"
-            elif operator == "is_empty":
-                comp_expr = f"not {field}"
-            elif operator == "is_not_empty":
-                comp_expr = f"bool({field})"
-            else:
+            template = _FMT.get(operator)
+            if template is None:
                 comp_expr = "True"
+            else:
+                comp_expr = template.format(f=field, v=_lit(value), raw=value)
 
             # Add to expression with logical operator
             if i == 0:
@@ -219,6 +366,8 @@ class RouterTemplate(BaseLogicTemplate):
 class MergeTemplate(BaseLogicTemplate):
     """Template for Merge logic nodes"""
 
+    __slots__ = ()
+
     def initialize(self, context: Any):
         """Return self to provide call/acall interface"""
         return self
@@ -231,7 +380,7 @@ class MergeTemplate(BaseLogicTemplate):
         """Async execution - logic is sync anyway"""
         return self.call(**inputs)
     
-    def generate_code(self, context: CodeGenerationContext) -> Dict[str, Any]:
+    def generate_code(self, context: CodeGenerationContext) -> GeneratedCode:
         """Generate code for Merge logic node"""
         instance_var = f"merge_{context.get_node_count('merge')}"
         
@@ -240,46 +389,49 @@ class MergeTemplate(BaseLogicTemplate):
             f"        # Merge logic - pass through all inputs"
         ]
         
-        return {
-            'signature': '',
-            'instance': f"        # Merge logic configured",
-            'forward': '\n'.join(forward_lines),
-            'dependencies': [],
-            'instance_var': instance_var
-        }
+        return GeneratedCode(
+            signature='',
+            instance=f"        # Merge logic configured",
+            forward='\n'.join(forward_lines),
+            dependencies=[],
+            instance_var=instance_var
+        )
 
 
 class FieldSelectorTemplate(BaseLogicTemplate):
     """Template for FieldSelector logic nodes"""
 
+    __slots__ = ('_selection',)
+
     def initialize(self, context: Any):
-        """Return self to provide call/acall interface"""
+        """Resolve output names once and return self to provide call/acall interface"""
+        field_mappings = self.node_data.get('field_mappings', {})
+
+        # (input name, output name) pairs - mapped name if provided, otherwise original name
+        self._selection: Tuple[Tuple[str, str], ...] = tuple(
+            (field_name, field_mappings.get(field_name, field_name))
+            for field_name in self.node_data.get('selected_fields', [])
+        )
         return self
 
     def call(self, **inputs) -> Dict[str, Any]:
         """Synchronous execution"""
-        selected_fields = self.node_data.get('selected_fields', [])
-        field_mappings = self.node_data.get('field_mappings', {})
-
-        if not selected_fields:
+        if not self._selection:
             # If no fields are explicitly selected, pass through all inputs
             return inputs
 
         # Filter inputs to only include selected fields
-        outputs = {}
-        for field_name in selected_fields:
-            if field_name in inputs:
-                # Use mapped name if provided, otherwise use original name
-                output_name = field_mappings.get(field_name, field_name)
-                outputs[output_name] = inputs[field_name]
-
-        return outputs
+        return {
+            output_name: inputs[field_name]
+            for field_name, output_name in self._selection
+            if field_name in inputs
+        }
 
     async def acall(self, **inputs) -> Dict[str, Any]:
         """Async execution - logic is sync anyway"""
         return self.call(**inputs)
     
-    def generate_code(self, context: CodeGenerationContext) -> Dict[str, Any]:
+    def generate_code(self, context: CodeGenerationContext) -> GeneratedCode:
         """Generate code for FieldSelector logic node"""
         selected_fields = self.node_data.get('selected_fields', [])
         field_mappings = self.node_data.get('field_mappings', {})
@@ -288,29 +440,33 @@ class FieldSelectorTemplate(BaseLogicTemplate):
         # Generate field selection code
         forward_lines = [
             f"        # FieldSelector logic",
-            f"        {instance_var}_selected = {selected_fields}",
-            f"        {instance_var}_mappings = {field_mappings}",
         ]
         
         if selected_fields:
-            forward_lines.extend([
-                f"        {instance_var}_outputs = {{}}",
-                f"        for field_name in {instance_var}_selected:",
-                f"            if field_name in locals():",
-                f"                output_name = {instance_var}_mappings.get(field_name, field_name)",
-                f"                {instance_var}_outputs[output_name] = locals()[field_name]"
-            ])
-            # Add output assignments
+            # Selected fields are known at codegen time, so assign them directly.
+            # Resolve each output name to its source in selection order, last write
+            # winning as in call(); a single tuple assignment then keeps swapped
+            # mappings (a->b, b->a) correct.
+            output_sources = {}
             for field_name in selected_fields:
-                output_name = field_mappings.get(field_name, field_name)
-                forward_lines.append(f"        {output_name} = {instance_var}_outputs.get('{output_name}')")
+                output_sources[field_mappings.get(field_name, field_name)] = field_name
+            renamed = [
+                (output_name, field_name)
+                for output_name, field_name in output_sources.items()
+                if output_name != field_name
+            ]
+            if renamed:
+                targets = ", ".join(output_name for output_name, _ in renamed)
+                sources = ", ".join(field_name for _, field_name in renamed)
+                forward_lines.append(f"        {targets} = {sources}")
         else:
             forward_lines.append(f"        # No fields selected - pass through all inputs")
+        forward_lines.append("")
         
-        return {
-            'signature': '',
-            'instance': f"        # FieldSelector logic configured: {selected_fields}",
-            'forward': '\n'.join(forward_lines) + "\n",
-            'dependencies': [],
-            'instance_var': instance_var
-        }
\ No newline at end of file
+        return GeneratedCode(
+            signature='',
+            instance=f"        # FieldSelector logic configured: {selected_fields}",
+            forward='\n'.join(forward_lines),
+            dependencies=[],
+            instance_var=instance_var
+        )
\ No newline at end of file
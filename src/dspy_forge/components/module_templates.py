@@ -2,26 +2,83 @@
 DSPy module component templates.
 
 Handles Predict, ChainOfThought, and other DSPy module types.
+
+Performance note: the hot paths here are generate_code, _generate_signature_code
+and _create_dynamic_signature. They are allocation-bound (small lists/dicts,
+string joins, type() class construction), not compute-bound; the rest is
+dispatch glue and not worth micro-optimizing.
 """
 import dspy
 
-from typing import Dict, Any, List, Literal, get_type_hints
-from dspy_forge.core.templates import NodeTemplate, CodeGenerationContext
-from dspy_forge.core.dspy_types import DSPyModuleType
+from io import StringIO
+from typing import Dict, Any, List, Optional, Tuple
+from dspy_forge.core.templates import NodeTemplate, CodeGenerationContext, GeneratedCode
 from dspy_forge.core.logging import get_logger
-from dspy_forge.core.lm_config import parse_model_name, create_lm
+from dspy_forge.core.lm_config import parse_model_name
 
 logger = get_logger(__name__)
 
+# Forward-code templates, filled per node via str.format_map
+_FORWARD_WITH_LM = (
+    "        with dspy.context(lm='{lm}'):\n"
+    "            {result_var} = self.{instance_var}({args}){extract}\n"
+)
+_FORWARD_DEFAULT_LM = "        {result_var} = self.{instance_var}({args}){extract}\n"
+_OUTPUT_ASSIGN = "\n        {field} = {result_var}.{field}"
+
+# Resolved signature field: (name, ui_type, description, enum_values)
+FieldSpec = Tuple[str, str, str, Optional[List[str]]]
+
+# Dynamic signature classes keyed by template class, instruction and field specs (FIFO-capped)
+_SIGNATURE_CACHE: Dict[tuple, type] = {}
+_SIGNATURE_CACHE_SIZE = 256
+
+
+def _hashable_specs(specs: List[FieldSpec]) -> tuple:
+    """Freeze field specs (enum value lists included) into a hashable cache key part"""
+    return tuple(
+        (field_name, field_type, field_desc, tuple(enum_values or ()))
+        for field_name, field_type, field_desc, enum_values in specs
+    )
+
 class BaseModuleTemplate(NodeTemplate):
     """Base template for DSPy module nodes"""
+
+    __slots__ = ('_emit_forward',)
+
+    # Connected output fields that the DSPy module adds itself and must not be declared on the signature
+    _SKIP_OUTPUT_FIELDS: frozenset = frozenset()
+
+    def __init__(self, node: Any, workflow: Any):
+        super().__init__(node, workflow)
+        # The model is fixed per node, so pick the forward emitter once instead of per generate_code
+        model_name = self.node_data.get('model', '')
+        if model_name and model_name != 'default':
+            self._emit_forward = self._emit_forward_with_lm
+        else:
+            self._emit_forward = self._emit_forward_plain
     
-    def _create_dynamic_signature(self, instruction: str):
-        """Create dynamic signature class for execution"""
-        # Get field information
-        input_fields = self._get_connected_fields(is_input=True)
-        output_fields = self._get_connected_fields(is_input=False)
-        
+    def _resolve_signature_fields(self) -> Tuple[List[FieldSpec], List[FieldSpec]]:
+        """Resolve connected input/output fields once into (name, type, description, enum values) specs"""
+        input_specs = [
+            (field_name, *self._get_field_info(field_name, is_input=True))
+            for field_name in self._get_connected_fields(is_input=True)
+        ]
+        output_specs = [
+            (field_name, *self._get_field_info(field_name, is_input=False))
+            for field_name in self._get_connected_fields(is_input=False)
+            if field_name not in self._SKIP_OUTPUT_FIELDS
+        ]
+        return input_specs, output_specs
+
+    def _create_dynamic_signature(self, instruction: str, input_specs: List[FieldSpec],
+                                  output_specs: List[FieldSpec]):
+        """Create dynamic signature class for execution, reusing an identical one if already built"""
+        cache_key = (type(self), instruction, _hashable_specs(input_specs), _hashable_specs(output_specs))
+        cached_signature = _SIGNATURE_CACHE.get(cache_key)
+        if cached_signature is not None:
+            return cached_signature
+
         # Build class attributes dictionary
         class_attrs = {}
         
@@ -31,33 +88,27 @@ class BaseModuleTemplate(NodeTemplate):
             class_attrs['__doc__'] = instruction
         
         # Add input fields
-        for field_name in input_fields:
-            field_type, field_desc, enum_values = self._get_field_info(field_name, is_input=True)
+        for field_name, field_type, field_desc, enum_values in input_specs:
             python_type = self._convert_ui_type_to_python_actual(field_type, enum_values)
             class_attrs['__annotations__'][field_name] = python_type
-            if field_desc:
-                class_attrs[field_name] = dspy.InputField(desc=field_desc)
-            else:
-                class_attrs[field_name] = dspy.InputField()
+            class_attrs[field_name] = dspy.InputField(**({'desc': field_desc} if field_desc else {}))
 
         # Add module-specific fields to class_attrs
         self._add_module_specific_fields_to_dict(class_attrs)
 
         # Add output fields
-        for field_name in output_fields:
-            if isinstance(self, ChainOfThoughtTemplate) and field_name == 'reasoning':
-                # Let reasoning be autoadded by dspy we only show it in UI
-                continue
-            field_type, field_desc, enum_values = self._get_field_info(field_name, is_input=False)
+        for field_name, field_type, field_desc, enum_values in output_specs:
             python_type = self._convert_ui_type_to_python_actual(field_type, enum_values)
             class_attrs['__annotations__'][field_name] = python_type
-            if field_desc:
-                class_attrs[field_name] = dspy.OutputField(desc=field_desc)
-            else:
-                class_attrs[field_name] = dspy.OutputField()
+            class_attrs[field_name] = dspy.OutputField(**({'desc': field_desc} if field_desc else {}))
         
         # Create the class with proper field definitions
         DynamicSignature = type('DynamicSignature', (dspy.Signature,), class_attrs)
+
+        _SIGNATURE_CACHE[cache_key] = DynamicSignature
+        if len(_SIGNATURE_CACHE) > _SIGNATURE_CACHE_SIZE:
+            # Evict the oldest entry
+            _SIGNATURE_CACHE.pop(next(iter(_SIGNATURE_CACHE)), None)
         
         return DynamicSignature
     
@@ -70,59 +121,59 @@ class BaseModuleTemplate(NodeTemplate):
         pass
     
     def _generate_signature_code(self, signature_name: str, instruction: str, 
-                               input_fields: List[str], output_fields: List[str]) -> str:
+                               input_specs: List[FieldSpec], output_specs: List[FieldSpec]) -> str:
         """Generate signature class code"""
-        lines = [f"class {signature_name}(dspy.Signature):"]
+        buffer = StringIO()
+        write = buffer.write
+        write(f"class {signature_name}(dspy.Signature):")
         
         if instruction:
-            lines.append(f'    """{instruction}"""')
+            if '"""' in instruction or '\\' in instruction or instruction.endswith('"'):
+                # Not representable as a plain triple-quoted docstring - escape it
+                write(f"\n    {instruction!r}")
+            else:
+                write(f'\n    """{instruction}"""')
         
         # Add input fields
-        for field_name in input_fields:
-            field_type, field_desc, enum_values = self._get_field_info(field_name, is_input=True)
+        for field_name, field_type, field_desc, enum_values in input_specs:
             python_type = self._convert_ui_type_to_python(field_type, enum_values)
-            if field_desc:
-                lines.append(f"    {field_name}: {python_type} = dspy.InputField(desc='{field_desc}')")
-            else:
-                lines.append(f"    {field_name}: {python_type} = dspy.InputField()")
+            desc_arg = f"desc={field_desc!r}" if field_desc else ""
+            write(f"\n    {field_name}: {python_type} = dspy.InputField({desc_arg})")
 
         # Add module-specific signature fields
-        self._add_signature_specific_fields(lines)
+        specific_lines = []
+        self._add_signature_specific_fields(specific_lines)
+        for line in specific_lines:
+            write(f"\n{line}")
 
         # Add output fields
-        for field_name in output_fields:
-            if isinstance(self, ChainOfThoughtTemplate) and field_name == 'reasoning':
-                # Let reasoning be autoadded by dspy we only show it in UI
-                continue
-            field_type, field_desc, enum_values = self._get_field_info(field_name, is_input=False)
+        for field_name, field_type, field_desc, enum_values in output_specs:
             python_type = self._convert_ui_type_to_python(field_type, enum_values)
-            if field_desc:
-                lines.append(f"    {field_name}: {python_type} = dspy.OutputField(desc='{field_desc}')")
-            else:
-                lines.append(f"    {field_name}: {python_type} = dspy.OutputField()")
+            desc_arg = f"desc={field_desc!r}" if field_desc else ""
+            write(f"\n    {field_name}: {python_type} = dspy.OutputField({desc_arg})")
         
-        return '\n'.join(lines)
+        return buffer.getvalue()
     
     def _add_signature_specific_fields(self, lines: List[str]):
         """Add module-specific fields to signature code - override in subclasses"""
         pass
     
-    def generate_code(self, context: CodeGenerationContext) -> Dict[str, Any]:
+    def generate_code(self, context: CodeGenerationContext) -> GeneratedCode:
         """Generate code for DSPy module node"""
         module_type_str = self.node_data.get('module_type', 'Unknown')
-        model_name = self.node_data.get('model', '')
         instruction = self.node_data.get('instruction', '')
         
-        # Get input and output fields
+        # Get input and output fields, resolved once for signature and forward emission
         input_fields = self._get_connected_fields(is_input=True)
         output_fields = self._get_connected_fields(is_input=False)
+        input_specs, output_specs = self._resolve_signature_fields()
         
         # Generate unique signature name
         signature_key = (module_type_str, tuple(input_fields), tuple(output_fields), instruction)
         signature_name = context.get_signature_name(signature_key)
         
         # Generate signature class code
-        signature_code = self._generate_signature_code(signature_name, instruction, input_fields, output_fields)
+        signature_code = self._generate_signature_code(signature_name, instruction, input_specs, output_specs)
         
         # Generate instance code
         node_count = context.get_node_count(module_type_str)
@@ -137,30 +188,31 @@ class BaseModuleTemplate(NodeTemplate):
         input_args = ", ".join([f"{field}={field}" for field in input_fields])
         result_var = f"result_{context.get_result_count()}"
 
-        forward_lines = []
-        if model_name and model_name != 'default':
-            # TODO handle api_key, api_base if need for other providers
-            provider, actual_model = parse_model_name(model_name)
-            forward_lines.append(f"        with dspy.context(lm='{provider}/{actual_model}'):")
-            forward_lines.append(f"            {result_var} = self.{instance_var}({input_args})")
-        else:
-            forward_lines.append(f"        {result_var} = self.{instance_var}({input_args})")
+        # Extract output fields; each assignment carries its own leading newline
+        extract = ''.join([_OUTPUT_ASSIGN.format(field=field, result_var=result_var) for field in output_fields])
 
-        # Extract output fields
-        for field in output_fields:
-            forward_lines.append(f"        {field} = {result_var}.{field}")
-        forward_lines[-1] += "\n"
-
-        forward_code = '\n'.join(forward_lines)
+        forward_code = self._emit_forward({
+            'result_var': result_var, 'instance_var': instance_var, 'args': input_args, 'extract': extract
+        })
         
-        return {
-            'signature': signature_code,
-            'instance': instance_code,
-            'forward': forward_code,
-            'dependencies': [],
-            'instance_var': instance_var,
-            'signature_name': signature_name
-        }
+        return GeneratedCode(
+            signature=signature_code,
+            instance=instance_code,
+            forward=forward_code,
+            dependencies=[],
+            instance_var=instance_var,
+            signature_name=signature_name
+        )
+    
+    def _emit_forward_plain(self, forward_values: Dict[str, str]) -> str:
+        """Emit the module call and output extraction using the default LM"""
+        return _FORWARD_DEFAULT_LM.format_map(forward_values)
+
+    def _emit_forward_with_lm(self, forward_values: Dict[str, str]) -> str:
+        """Emit the module call wrapped in a dspy.context for the node's model"""
+        # TODO handle api_key, api_base if need for other providers
+        provider, actual_model = parse_model_name(self.node_data.get('model', ''))
+        return _FORWARD_WITH_LM.format_map({**forward_values, 'lm': f"{provider}/{actual_model}"})
     
     def _generate_instance_code(self, instance_var: str, signature_name: str) -> str:
         """Generate instance creation code - override in subclasses"""
@@ -171,13 +223,15 @@ class BaseModuleTemplate(NodeTemplate):
 class PredictTemplate(BaseModuleTemplate):
     """Template for Predict module nodes"""
 
+    __slots__ = ()
+
     def initialize(self, context: Any):
         """
         Initialize Predict module as a DSPy component.
         Returns a DSPy.Predict instance which has built-in call() and acall() methods.
         """
         instruction = self.node_data.get('instruction', '')
-        signature_class = self._create_dynamic_signature(instruction)
+        signature_class = self._create_dynamic_signature(instruction, *self._resolve_signature_fields())
         return dspy.Predict(signature_class)
     
     def _generate_instance_code(self, instance_var: str, signature_name: str) -> str:
@@ -188,13 +242,18 @@ class PredictTemplate(BaseModuleTemplate):
 class ChainOfThoughtTemplate(BaseModuleTemplate):
     """Template for ChainOfThought module nodes"""
 
+    __slots__ = ()
+
+    # Let reasoning be autoadded by dspy we only show it in UI
+    _SKIP_OUTPUT_FIELDS = frozenset({'reasoning'})
+
     def initialize(self, context: Any):
         """
         Initialize ChainOfThought module as a DSPy component.
         Returns a DSPy.ChainOfThought instance which has built-in call() and acall() methods.
         """
         instruction = self.node_data.get('instruction', '')
-        signature_class = self._create_dynamic_signature(instruction)
+        signature_class = self._create_dynamic_signature(instruction, *self._resolve_signature_fields())
         return dspy.ChainOfThought(signature_class)
     
     def _generate_instance_code(self, instance_var: str, signature_name: str) -> str:
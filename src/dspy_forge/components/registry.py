@@ -30,71 +30,74 @@ def register_all_templates():
     TemplateFactory.register_template(NodeType.LOGIC, LogicTemplateDispatcher)
 
 
-class ModuleTemplateDispatcher:
-    """Dispatcher for different module template types"""
+class TemplateDispatcher:
+    """Base dispatcher - picks a concrete template class from _TABLE by a node data key"""
 
-    def __init__(self, node, workflow):
-        module_type = node.data.get('module_type')
+    __slots__ = ('_template',)
+
+    _TYPE_KEY = ''
+    _TABLE = {}
+    _DEFAULT = None
 
-        if module_type == ModuleType.PREDICT.value:
-            self._template = PredictTemplate(node, workflow)
-        elif module_type == ModuleType.CHAIN_OF_THOUGHT.value:
-            self._template = ChainOfThoughtTemplate(node, workflow)
-        else:
-            # Default to PredictTemplate for unknown types
-            self._template = PredictTemplate(node, workflow)
+    def __init__(self, node, workflow):
+        template_class = self._TABLE.get(node.data.get(self._TYPE_KEY), self._DEFAULT)
+        self._template = template_class(node, workflow)
 
     def initialize(self, context):
-        """Initialize returns DSPy component with built-in call/acall"""
+        """Initialize the underlying template's component with call/acall"""
         return self._template.initialize(context)
 
     def generate_code(self, context):
         return self._template.generate_code(context)
 
-class RetrieverTemplateDispatcher:
-    """Dispatcher for different retriever template types"""
+    def __getattr__(self, name):
+        # Forward anything else (helpers such as _get_connected_fields) to the concrete template
+        if name == '_template':
+            raise AttributeError(name)
+        return getattr(self._template, name)
 
-    def __init__(self, node, workflow):
-        retriever_type = node.data.get('retriever_type')
 
-        if retriever_type == RetrieverType.UNSTRUCTURED_RETRIEVE.value:
-            self._template = UnstructuredRetrieveTemplate(node, workflow)
-        elif retriever_type == RetrieverType.STRUCTURED_RETRIEVE.value:
-            self._template = StructuredRetrieveTemplate(node, workflow)
-        else:
-            # Default to UnstructuredRetrieveTemplate for unknown types
-            self._template = UnstructuredRetrieveTemplate(node, workflow)
+class ModuleTemplateDispatcher(TemplateDispatcher):
+    """Dispatcher for different module template types"""
 
-    def initialize(self, context):
-        """Initialize returns wrapper component with call/acall"""
-        return self._template.initialize(context)
+    __slots__ = ()
 
-    def generate_code(self, context):
-        return self._template.generate_code(context)
+    _TYPE_KEY = 'module_type'
+    _TABLE = {
+        ModuleType.PREDICT.value: PredictTemplate,
+        ModuleType.CHAIN_OF_THOUGHT.value: ChainOfThoughtTemplate,
+    }
+    # Default to PredictTemplate for unknown types
+    _DEFAULT = PredictTemplate
 
 
-class LogicTemplateDispatcher:
-    """Dispatcher for different logic template types"""
+class RetrieverTemplateDispatcher(TemplateDispatcher):
+    """Dispatcher for different retriever template types"""
 
-    def __init__(self, node, workflow):
-        logic_type = node.data.get('logic_type')
-
-        if logic_type == LogicType.ROUTER.value:
-            self._template = RouterTemplate(node, workflow)
-        elif logic_type == LogicType.MERGE.value:
-            self._template = MergeTemplate(node, workflow)
-        elif logic_type == LogicType.FIELD_SELECTOR.value:
-            self._template = FieldSelectorTemplate(node, workflow)
-        else:
-            # Default to MergeTemplate for unknown types
-            self._template = MergeTemplate(node, workflow)
+    __slots__ = ()
 
-    def initialize(self, context):
-        """Initialize returns self (template) with call/acall"""
-        return self._template.initialize(context)
+    _TYPE_KEY = 'retriever_type'
+    _TABLE = {
+        RetrieverType.UNSTRUCTURED_RETRIEVE.value: UnstructuredRetrieveTemplate,
+        RetrieverType.STRUCTURED_RETRIEVE.value: StructuredRetrieveTemplate,
+    }
+    # Default to UnstructuredRetrieveTemplate for unknown types
+    _DEFAULT = UnstructuredRetrieveTemplate
 
-    def generate_code(self, context):
-        return self._template.generate_code(context)
+
+class LogicTemplateDispatcher(TemplateDispatcher):
+    """Dispatcher for different logic template types"""
+
+    __slots__ = ()
+
+    _TYPE_KEY = 'logic_type'
+    _TABLE = {
+        LogicType.ROUTER.value: RouterTemplate,
+        LogicType.MERGE.value: MergeTemplate,
+        LogicType.FIELD_SELECTOR.value: FieldSelectorTemplate,
+    }
+    # Default to MergeTemplate for unknown types
+    _DEFAULT = MergeTemplate
 
 
 # Auto-register all templates when this module is imported
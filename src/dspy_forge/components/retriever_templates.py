@@ -2,98 +2,273 @@
 Retriever component templates.
 
 Handles UnstructuredRetrieve and StructuredRetrieve node types.
+
+Performance note: call/acall are network-IO-bound - each retrieval is a Vector
+Search or Genie REST round-trip, which dwarfs the Python around it. Do not JIT
+or compile these paths (numba/cython only add import cost here); latency is won
+by overlapping requests, see batch_call and acall.
 """
-import os, ast
+import asyncio
+import contextvars
+import inspect
+import threading
+import time
+import weakref
 import dspy
 
-from typing import Dict, Any
+from abc import abstractmethod
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from functools import lru_cache, partial
+from typing import Dict, Any, List, Callable, Tuple
 
-from dspy_forge.core.templates import NodeTemplate, CodeGenerationContext
+from dspy_forge.core.config import get_settings
+from dspy_forge.core.templates import NodeTemplate, CodeGenerationContext, GeneratedCode
 from dspy.retrievers.databricks_rm import DatabricksRM
-from dspy_forge.components.genie.databricks_genie import DatabricksGenieRM
+
+# Vector Search passages keyed by (retriever config, query, query_type), stored with their expiry time,
+# LRU-evicted and shared by all nodes
+_retrieval_cache: "OrderedDict[tuple, Tuple[float, List[Any]]]" = OrderedDict()
+_retrieval_cache_lock = threading.Lock()
+
+# Retriever clients shared by nodes with identical configuration; an entry lives as long as a template uses it
+_shared_retrievers: "weakref.WeakValueDictionary[tuple, Any]" = weakref.WeakValueDictionary()
+_shared_retrievers_lock = threading.Lock()
+
+
+def _get_shared_retriever(key: tuple, factory: Callable[[], Any]) -> Any:
+    """Return the live retriever for this configuration, creating it with factory() if there is none"""
+    with _shared_retrievers_lock:
+        retriever = _shared_retrievers.get(key)
+        if retriever is None:
+            retriever = factory()
+            _shared_retrievers[key] = retriever
+        return retriever
+
+
+@lru_cache(maxsize=1)
+def _get_retriever_executor() -> ThreadPoolExecutor:
+    """
+    Dedicated pool for blocking retriever requests, so they neither queue behind nor starve other work on
+    the event loop's default executor. Its size caps in-flight retrievals. Created on first use, so importing
+    the components does not load settings
+    """
+    return ThreadPoolExecutor(
+        max_workers=get_settings().retriever_max_concurrency,
+        thread_name_prefix="retriever"
+    )
+
+
+@lru_cache(maxsize=1)
+def _get_retrieval_cache_settings() -> Tuple[int, float]:
+    """Retrieval cache (capacity, entry lifetime in seconds) from settings, read on the first cache insert"""
+    settings = get_settings()
+    return settings.retriever_cache_size, settings.retriever_cache_ttl_seconds
+
+# Generated-code skeletons, filled per node via str.format
+_UNSTRUCTURED_INSTANCE = (
+    "        # Initialize DatabricksRM retriever\n"
+    "        self.{instance_var} = DatabricksRM(\n"
+    "            databricks_index_name=\"{index_name}\",\n"
+    "            text_column_name=\"{content_column}\",\n"
+    "            docs_id_column_name=\"{id_column}\",\n"
+    "            k={num_results},\n"
+    "            use_with_databricks_agent_framework=True\n"
+    "        )\n"
+)
+_UNSTRUCTURED_FORWARD = (
+    "        # Execute UnstructuredRetrieve\n"
+    "        {output_field} = self.{instance_var}({input_field}, query_type='{query_type}')\n"
+)
+_STRUCTURED_INSTANCE = (
+    "        # Initialize DatabricksGenieRM retriever\n"
+    "        self.{instance_var} = DatabricksGenieRM(\n"
+    "            databricks_genie_space_id=\"{genie_space_id}\",\n"
+    "            databricks_workspace_client=get_user_authorized_client(),\n"
+    "            use_with_databricks_agent_framework=False\n"
+    "        )\n"
+)
+_STRUCTURED_FORWARD = (
+    "        # Execute StructuredRetrieve\n"
+    "        genie_result = self.{instance_var}.forward({query_arg})\n"
+    "        context = genie_result.result[0] if genie_result.result else ''\n"
+    "        sql_query = getattr(genie_result, 'query_sql', '')\n"
+    "        query_reasoning = getattr(genie_result, 'query_reasoning', '')\n"
+)
+
+
+# DatabricksGenieRM pulls in the Genie client stack; it is imported only once structured retrieval is used
+_genie_rm_class = None
+
+
+def _get_genie_rm_class() -> type:
+    """Import DatabricksGenieRM on first use and reuse the class afterwards"""
+    global _genie_rm_class
+    if _genie_rm_class is None:
+        from dspy_forge.components.genie.databricks_genie import DatabricksGenieRM
+        _genie_rm_class = DatabricksGenieRM
+    return _genie_rm_class
+
+
+@lru_cache(maxsize=1)
+def _read_genie_class_definition() -> str:
+    """Get the DatabricksGenieRM class source for embedding in generated programs (computed once per process)"""
+    return inspect.getsource(_get_genie_rm_class()).strip()
+
 
 class BaseRetrieverTemplate(NodeTemplate):
     """Base template for retriever nodes"""
 
+    __slots__ = ('retriever',)
+
+    @abstractmethod
+    def _retrieve(self, query: str) -> dspy.Prediction:
+        """Run one query against the initialized retriever"""
+        pass
+
+    def call(self, **inputs) -> dspy.Prediction:
+        """Synchronous call for optimization"""
+        return self._retrieve(self._extract_query(inputs))
+
+    async def acall(self, **inputs) -> dspy.Prediction:
+        """Async call for playground - runs the blocking retriever request on the retriever pool"""
+        loop = asyncio.get_running_loop()
+        # Carry context variables (dspy settings, tracing) into the worker like asyncio.to_thread does
+        context = contextvars.copy_context()
+        return await loop.run_in_executor(_get_retriever_executor(), partial(context.run, self.call, **inputs))
+
+    def batch_call(self, queries: List[str]) -> List[dspy.Prediction]:
+        """
+        Retrieve for many queries at once, returning predictions in input order.
+
+        Neither DatabricksRM nor Genie accepts several queries per request, so duplicates
+        are collapsed and the remaining round-trips are overlapped on the retriever pool.
+        """
+        unique_queries = list(dict.fromkeys(queries))
+        if len(unique_queries) <= 1:
+            # Nothing to overlap
+            results = {query: self._retrieve(query) for query in unique_queries}
+        else:
+            results = dict(zip(unique_queries, _get_retriever_executor().map(self._retrieve, unique_queries)))
+
+        return [results[query] for query in queries]
+
     @staticmethod
     def _extract_query(inputs: Dict[str, Any]) -> str:
         """Extract query from inputs"""
-        query = inputs.get('query', inputs.get('question', ''))
-        if not query:
-            # Try to get the first string input as query
-            for key, value in inputs.items():
-                if isinstance(value, str) and value.strip():
-                    query = value
-                    break
+        # Common case: the query arrives under one of the conventional keys
+        query = inputs.get('query')
+        if query:
+            return query
+        query = inputs.get('question')
+        if query:
+            return query
 
-        if not query:
-            raise ValueError("No query found in inputs for retriever")
+        # Try to get the first string input as query
+        for value in inputs.values():
+            if isinstance(value, str) and value.strip():
+                return value
 
-        return query
+        raise ValueError("No query found in inputs for retriever")
 
 class UnstructuredRetrieveTemplate(BaseRetrieverTemplate):
     """Template for UnstructuredRetrieve nodes"""
 
+    __slots__ = (
+        'query_type', '_search', '_retriever_key', '_catalog_name', '_schema_name', '_index_name',
+        '_content_column', '_id_column', '_num_results'
+    )
+
+    def __init__(self, node: Any, workflow: Any):
+        super().__init__(node, workflow)
+        # Read node configuration once; both initialize and generate_code use it
+        node_data = self.node_data
+        self.query_type = node_data.get('query_type', '')
+        self._catalog_name = node_data.get('catalog_name', '')
+        self._schema_name = node_data.get('schema_name', '')
+        self._index_name = node_data.get('index_name', '')
+        self._content_column = node_data.get('content_column', '')
+        self._id_column = node_data.get('id_column', '')
+        self._num_results = node_data.get('num_results', 3)
+
     def initialize(self, context: Any):
         """Initialize UnstructuredRetrieve component with call/acall interface"""
-        self.query_type = self.node_data.get('query_type', '')
-
-        # Initialize retriever once
-        catalog_name = self.node_data.get('catalog_name', '')
-        schema_name = self.node_data.get('schema_name', '')
-        index_name = self.node_data.get('index_name', '')
-        content_column = self.node_data.get('content_column', '')
-        id_column = self.node_data.get('id_column', '')
-        num_results = self.node_data.get('num_results', 3)
-
-        if not all([catalog_name, schema_name, index_name, content_column, id_column]):
+        if not all([self._catalog_name, self._schema_name, self._index_name, self._content_column, self._id_column]):
             raise ValueError("UnstructuredRetrieve requires catalog_name, schema_name, index_name, content_column, and id_column")
 
-        databricks_index_name = f"{catalog_name}.{schema_name}.{index_name}"
+        databricks_index_name = f"{self._catalog_name}.{self._schema_name}.{self._index_name}"
 
-        self.retriever = DatabricksRM(
-            databricks_index_name=databricks_index_name,
-            text_column_name=content_column,
-            docs_id_column_name=id_column,
-            k=num_results,
-            use_with_databricks_agent_framework=False
+        # Initialize retriever once
+        self._retriever_key = ('DatabricksRM', databricks_index_name, self._content_column, self._id_column, self._num_results)
+        self.retriever = _get_shared_retriever(
+            self._retriever_key,
+            lambda: DatabricksRM(
+                databricks_index_name=databricks_index_name,
+                text_column_name=self._content_column,
+                docs_id_column_name=self._id_column,
+                k=self._num_results,
+                use_with_databricks_agent_framework=False
+            )
         )
+        # Bind the query type into the call once so each retrieval is a single call
+        self._search = partial(self.retriever, query_type=self.query_type)
         return self
 
-    def call(self, **inputs) -> dspy.Prediction:
-        """Synchronous call for optimization"""
-        query = self._extract_query(inputs)
-        result = self.retriever(query, query_type=self.query_type)
-
-        # Extract passages
-        passages = result.docs
-        if hasattr(passages, 'passages'):
-            context_list = [passage for passage in passages.passages]
-        elif isinstance(passages, list):
-            context_list = passages
+    def _retrieve(self, query: str) -> dspy.Prediction:
+        """Query the vector search index, serving repeated queries from the retrieval cache"""
+        if isinstance(query, str):
+            cache_key = (self._retriever_key, query, self.query_type)
+            context_list = None
+            with _retrieval_cache_lock:
+                entry = _retrieval_cache.get(cache_key)
+                if entry is not None:
+                    if time.monotonic() < entry[0]:
+                        context_list = entry[1]
+                        _retrieval_cache.move_to_end(cache_key)
+                    else:
+                        # Expired - the index may have been synced since
+                        del _retrieval_cache[cache_key]
+
+            if context_list is None:
+                context_list = self._search_passages(query)
+                cache_size, cache_ttl = _get_retrieval_cache_settings()
+                if cache_size > 0 and cache_ttl > 0:
+                    with _retrieval_cache_lock:
+                        _retrieval_cache[cache_key] = (time.monotonic() + cache_ttl, context_list)
+                        _retrieval_cache.move_to_end(cache_key)
+                        if len(_retrieval_cache) > cache_size:
+                            _retrieval_cache.popitem(last=False)
         else:
-            context_list = [str(passages)]
+            context_list = self._search_passages(query)
 
+        # Hand out a copy so callers cannot mutate the cached entry
+        context_list = list(context_list)
         return dspy.Prediction(
             context=context_list,
             passages=context_list,
             query=query
         )
 
-    async def acall(self, **inputs) -> dspy.Prediction:
-        """Async call for playground - retrievers are sync anyway"""
-        return self.call(**inputs)
+    def _search_passages(self, query: str) -> List[Any]:
+        """Run the vector search and normalize the returned docs into a list of passages"""
+        result = self._search(query)
+
+        # Extract passages; DatabricksRM returns a plain list in the common case
+        passages = result.docs
+        if isinstance(passages, list):
+            context_list = passages
+        else:
+            # Prediction-style result; fetch the attribute once instead of probing then reading it
+            nested_passages = getattr(passages, 'passages', None)
+            if nested_passages is not None:
+                context_list = list(nested_passages)
+            else:
+                context_list = [str(passages)]
+
+        return context_list
     
-    def generate_code(self, context: CodeGenerationContext) -> Dict[str, Any]:
+    def generate_code(self, context: CodeGenerationContext) -> GeneratedCode:
         """Generate code for UnstructuredRetrieve node"""
-        query_type = self.node_data.get('query_type', '')
-        catalog_name = self.node_data.get('catalog_name', '')
-        schema_name = self.node_data.get('schema_name', '')
-        index_name = self.node_data.get('index_name', '')
-        content_column = self.node_data.get('content_column', '')
-        id_column = self.node_data.get('id_column', '')
-        num_results = self.node_data.get('num_results', 3)
-
         # Get input and output fields
         input_fields = self._get_connected_fields(is_input=True)
         output_fields = self._get_connected_fields(is_input=False)
@@ -104,60 +279,62 @@ class UnstructuredRetrieveTemplate(BaseRetrieverTemplate):
         context.node_to_var_mapping[self.node_id] = instance_var
 
         # Construct full index name
-        databricks_index_name = f"{catalog_name}.{schema_name}.{index_name}"
+        databricks_index_name = f"{self._catalog_name}.{self._schema_name}.{self._index_name}"
         
         # Generate instance initialization
-        instance_lines = [
-            f"        # Initialize DatabricksRM retriever",
-            f"        self.{instance_var} = DatabricksRM(",
-            f"            databricks_index_name=\"{databricks_index_name}\",",
-            f"            text_column_name=\"{content_column}\",",
-            f"            docs_id_column_name=\"{id_column}\",",
-            f"            k={num_results},",
-            f"            use_with_databricks_agent_framework=True", 
-            f"        )"
-        ]
-        instance_lines[-1] += "\n"
-        
+        instance_code = _UNSTRUCTURED_INSTANCE.format(
+            instance_var=instance_var,
+            index_name=databricks_index_name,
+            content_column=self._content_column,
+            id_column=self._id_column,
+            num_results=self._num_results
+        )
+
         # Generate execution code
-        forward_lines = [
-            f"        # Execute UnstructuredRetrieve",
-            f"        {output_fields[0]} = self.{instance_var}({input_fields[0]}, query_type='{query_type}')"
-        ]
-        forward_lines[-1] += "\n"
-        
-        instance_code = '\n'.join(instance_lines)
-        forward_code = '\n'.join(forward_lines)
-        
-        return {
-            'signature': '',
-            'instance': instance_code,
-            'forward': forward_code,
-            'dependencies': ['from dspy.retrieve.databricks_rm import DatabricksRM'],
-            'instance_var': instance_var
-        }
+        forward_code = _UNSTRUCTURED_FORWARD.format(
+            output_field=output_fields[0],
+            instance_var=instance_var,
+            input_field=input_fields[0],
+            query_type=self.query_type
+        )
+
+        return GeneratedCode(
+            signature='',
+            instance=instance_code,
+            forward=forward_code,
+            dependencies=['from dspy.retrieve.databricks_rm import DatabricksRM'],
+            instance_var=instance_var
+        )
 
 
 class StructuredRetrieveTemplate(BaseRetrieverTemplate):
     """Template for StructuredRetrieve nodes"""
 
+    __slots__ = ('_genie_space_id',)
+
+    def __init__(self, node: Any, workflow: Any):
+        super().__init__(node, workflow)
+        self._genie_space_id = self.node_data.get('genie_space_id', '')
+
     def initialize(self, context: Any):
         """Initialize StructuredRetrieve component with call/acall interface"""
-        genie_space_id = self.node_data.get('genie_space_id', '')
+        genie_space_id = self._genie_space_id
 
         if not genie_space_id:
             raise ValueError("StructuredRetrieve requires genie_space_id")
 
-        # Initialize Genie retriever once
-        self.retriever = DatabricksGenieRM(
-            databricks_genie_space_id=genie_space_id,
-            use_with_databricks_agent_framework=False
+        # Initialize Genie retriever once, shared with other nodes querying the same space
+        self.retriever = _get_shared_retriever(
+            ('DatabricksGenieRM', genie_space_id),
+            lambda: _get_genie_rm_class()(
+                databricks_genie_space_id=genie_space_id,
+                use_with_databricks_agent_framework=False
+            )
         )
         return self
 
-    def call(self, **inputs) -> dspy.Prediction:
-        """Synchronous call for optimization"""
-        query = self._extract_query(inputs)
+    def _retrieve(self, query: str) -> dspy.Prediction:
+        """Ask the Genie space"""
         result = self.retriever(query)
 
         # Extract fields from the Prediction object
@@ -173,15 +350,9 @@ class StructuredRetrieveTemplate(BaseRetrieverTemplate):
             conversation_id=conversation_id,
             query=query
         )
-
-    async def acall(self, **inputs) -> dspy.Prediction:
-        """Async call for playground - Genie is sync anyway"""
-        return self.call(**inputs)
     
-    def generate_code(self, context: CodeGenerationContext) -> Dict[str, Any]:
+    def generate_code(self, context: CodeGenerationContext) -> GeneratedCode:
         """Generate code for StructuredRetrieve node"""
-        genie_space_id = self.node_data.get('genie_space_id', '')
-        
         # Get input fields
         input_fields = self._get_connected_fields(is_input=True)
 
@@ -191,59 +362,19 @@ class StructuredRetrieveTemplate(BaseRetrieverTemplate):
         context.node_to_var_mapping[self.node_id] = instance_var
 
         # Generate instance initialization
-        instance_lines = [
-            f"        # Initialize DatabricksGenieRM retriever",
-            f"        self.{instance_var} = DatabricksGenieRM(",
-            f"            databricks_genie_space_id=\"{genie_space_id}\",",
-            f"            databricks_workspace_client=get_user_authorized_client(),",
-            f"            use_with_databricks_agent_framework=False",
-            f"        )"
-        ]
-        instance_lines[-1] += "\n"
-        
+        instance_code = _STRUCTURED_INSTANCE.format(instance_var=instance_var, genie_space_id=self._genie_space_id)
+
         # Generate execution code
-        forward_lines = [
-            f"        # Execute StructuredRetrieve",
-            f"        genie_result = self.{instance_var}.forward({input_fields[0] if input_fields else 'query'})",
-            f"        context = genie_result.result[0] if genie_result.result else ''",
-            f"        sql_query = getattr(genie_result, 'query_sql', '')",
-            f"        query_reasoning = getattr(genie_result, 'query_reasoning', '')"
-        ]
-        forward_lines[-1] += "\n"
-        
-        instance_code = '\n'.join(instance_lines)
-        forward_code = '\n'.join(forward_lines)
-        
-        # Read DatabricksGenieRM class definition from the original file
-        def _read_genie_class_definition():
-            # Get the path to the databricks_genie.py file
-            current_dir = os.path.dirname(os.path.abspath(__file__))
-            genie_file_path = os.path.join(current_dir, 'genie', 'databricks_genie.py')
-            
-            # Read the file content
-            with open(genie_file_path, 'r') as f:
-                file_content = f.read()
-                
-                # Parse the AST to extract only the class definition
-                tree = ast.parse(file_content)
-                
-                # Find the DatabricksGenieRM class
-                for node in ast.walk(tree):
-                    if isinstance(node, ast.ClassDef) and node.name == 'DatabricksGenieRM':
-                        # Get the source code for this class
-                        class_lines = file_content.split('\n')[node.lineno-1:node.end_lineno]
-                        class_definition = '\n'.join(class_lines)
-                        return class_definition
-                
-            raise ValueError("DatabricksGenieRM class not found in databricks_genie.py")
-        
-        genie_class_definition = _read_genie_class_definition()
-
-        return {
-            'signature': '',
-            'instance': instance_code,
-            'forward': forward_code,
-            'dependencies': [],
-            'class_definition': genie_class_definition.strip(),
-            'instance_var': instance_var
-        }
\ No newline at end of file
+        forward_code = _STRUCTURED_FORWARD.format(
+            instance_var=instance_var,
+            query_arg=input_fields[0] if input_fields else 'query'
+        )
+
+        return GeneratedCode(
+            signature='',
+            instance=instance_code,
+            forward=forward_code,
+            dependencies=[],
+            class_definition=_read_genie_class_definition(),
+            instance_var=instance_var
+        )
\ No newline at end of file
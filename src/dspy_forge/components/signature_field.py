@@ -5,38 +5,42 @@ Handles pass-through validation for input/output signature fields.
 """
 
 from typing import Dict, Any
-from dspy_forge.core.templates import NodeTemplate, CodeGenerationContext
+from dspy_forge.core.templates import NodeTemplate, CodeGenerationContext, GeneratedCode
 
 
 class SignatureFieldTemplate(NodeTemplate):
     """Template for signature field nodes"""
 
+    __slots__ = ('_field_specs', '_is_end')
+
     def initialize(self, context: Any):
         """Return self to provide call/acall interface"""
+        is_start = self.node_data.get('is_start', False) or self.node_data.get('isStart', False)
+        self._is_end = self.node_data.get('is_end', False) or self.node_data.get('isEnd', False)
+
+        # (field name, must be present) - only start nodes enforce required fields
+        self._field_specs = tuple(
+            (field_data.get('name'), is_start and field_data.get('required', True))
+            for field_data in self.node_data.get('fields', [])
+        )
         return self
 
     def call(self, **inputs) -> Dict[str, Any]:
         """Synchronous execution (pass-through with validation)"""
-        fields = self.node_data.get('fields', [])
         outputs = {}
 
-        is_start = self.node_data.get('is_start', False) or self.node_data.get('isStart', False)
-        is_end = self.node_data.get('is_end', False) or self.node_data.get('isEnd', False)
-
         # For start nodes, validate that required fields are present
         # For end nodes, just pass through whatever is available
-        for field_data in fields:
-            field_name = field_data.get('name')
-            required = field_data.get('required', True)
-
+        for field_name, must_be_present in self._field_specs:
             if field_name in inputs:
                 outputs[field_name] = inputs[field_name]
-            elif required and is_start:
+            elif must_be_present:
                 raise ValueError(f"Required field '{field_name}' not found in inputs for start node")
 
         # If no outputs were generated for an end node, pass through all inputs
-        if is_end and not outputs:
-            outputs = inputs.copy()
+        # (**inputs is already a fresh dict, so no copy is needed)
+        if self._is_end and not outputs:
+            return inputs
 
         return outputs
 
@@ -44,12 +48,12 @@ class SignatureFieldTemplate(NodeTemplate):
         """Async execution - validation is sync anyway"""
         return self.call(**inputs)
     
-    def generate_code(self, context: CodeGenerationContext) -> Dict[str, Any]:
+    def generate_code(self, context: CodeGenerationContext) -> GeneratedCode:
         """Generate code for signature field node (no executable code needed)"""
-        return {
-            'signature': '',
-            'instance': '',
-            'forward': '',
-            'dependencies': [],
-            'instance_var': ''
-        }
\ No newline at end of file
+        return GeneratedCode(
+            signature='',
+            instance='',
+            forward='',
+            dependencies=[],
+            instance_var=''
+        )
\ No newline at end of file
@@ -1,32 +1,42 @@
 import os
-import mlflow
 
+from functools import lru_cache
 from pydantic_settings import BaseSettings
 from typing import Optional, Literal
 
-from databricks.sdk import WorkspaceClient
 from dspy_forge.core.logging import get_logger
 
 logger = get_logger(__name__)
 
+def _set_mlflow_uris(tracking_uri: str, registry_uri: str):
+    # mlflow is heavy to import; only pay for it once settings are first requested
+    import mlflow
+
+    mlflow.set_tracking_uri(tracking_uri)
+    mlflow.set_registry_uri(registry_uri)
+
 def configure_databricks_auth(settings):
     # Set Databricks SDK environment variables from settings
-    if settings.databricks_config_profile:
-        os.environ["MLFLOW_ENABLE_DB_SDK"] = "true"
-        os.environ["DATABRICKS_CONFIG_PROFILE"] = settings.databricks_config_profile
-        mlflow.set_tracking_uri(f"databricks://{settings.databricks_config_profile}")
-        mlflow.set_registry_uri(f"databricks-uc://{settings.databricks_config_profile}")
-    elif settings.databricks_host and settings.databricks_token:
-        os.environ["MLFLOW_ENABLE_DB_SDK"] = "true"
-        os.environ["DATABRICKS_HOST"] = settings.databricks_host
-        os.environ["DATABRICKS_TOKEN"] = settings.databricks_token
-        mlflow.set_tracking_uri("databricks")
-        mlflow.set_registry_uri("databricks-uc")
-    elif (os.environ.get("DATABRICKS_CLIENT_ID", None) and 
-        os.environ.get("DATABRICKS_CLIENT_SECRET", None)):
-        os.environ["MLFLOW_ENABLE_DB_SDK"] = "true"
-        mlflow.set_tracking_uri("databricks")
-        mlflow.set_registry_uri("databricks-uc")
+    env = os.environ
+    profile = settings.databricks_config_profile
+    host, token = settings.databricks_host, settings.databricks_token
+
+    if profile:
+        env.update({
+            "MLFLOW_ENABLE_DB_SDK": "true",
+            "DATABRICKS_CONFIG_PROFILE": profile,
+        })
+        _set_mlflow_uris(f"databricks://{profile}", f"databricks-uc://{profile}")
+    elif host and token:
+        env.update({
+            "MLFLOW_ENABLE_DB_SDK": "true",
+            "DATABRICKS_HOST": host,
+            "DATABRICKS_TOKEN": token,
+        })
+        _set_mlflow_uris("databricks", "databricks-uc")
+    elif env.get("DATABRICKS_CLIENT_ID") and env.get("DATABRICKS_CLIENT_SECRET"):
+        env["MLFLOW_ENABLE_DB_SDK"] = "true"
+        _set_mlflow_uris("databricks", "databricks-uc")
     else:
         logger.info(
             "Databricks integration is not configured."
@@ -62,6 +72,11 @@ class Settings(BaseSettings):
     custom_lm_api_base: Optional[str] = None
     custom_lm_api_key: Optional[str] = None
 
+    # Retriever settings
+    retriever_max_concurrency: int = 8  # Max in-flight Vector Search / Genie requests per process
+    retriever_cache_size: int = 1024  # Vector Search results kept in the per-process LRU cache (0 disables)
+    retriever_cache_ttl_seconds: float = 300  # Max age of a cached Vector Search result (0 disables caching)
+
     # CORS settings
     allowed_origins: list[str] = ["http://localhost:3000", "http://127.0.0.1:3000"]
 
@@ -69,6 +84,16 @@ class Settings(BaseSettings):
         env_file = ".env"
 
 
-settings = Settings()
+@lru_cache(maxsize=1)
+def get_settings() -> Settings:
+    """Load settings and configure Databricks auth on first use"""
+    settings = Settings()
+    configure_databricks_auth(settings)
+    return settings
+
 
-configure_databricks_auth(settings)
\ No newline at end of file
+def __getattr__(name: str):
+    # Backwards compatible `from dspy_forge.core.config import settings`
+    if name == "settings":
+        return get_settings()
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
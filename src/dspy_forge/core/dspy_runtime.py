@@ -1,25 +1,37 @@
 
+import asyncio
+import time
 import dspy
 
-from typing import Dict, Any, List, Optional
-from datetime import datetime
+from typing import Dict, Any, List, Optional, Tuple
+from functools import lru_cache
 
 from dspy_forge.core.logging import get_logger
 from dspy_forge.core.lm_config import create_lm
 from dspy_forge.utils.workflow_utils import (
     get_execution_order,
+    get_execution_levels,
     find_start_nodes,
     find_end_nodes,
-    get_node_dependencies,
     identify_router_nodes,
     get_branch_paths,
 )
-from dspy_forge.core.templates import TemplateFactory
+from dspy_forge.core.templates import TemplateFactory, get_workflow_index
 from dspy_forge.models.workflow import Workflow, WorkflowExecution
 from dspy_forge.components import registry  # This will auto-register all templates
 
 logger = get_logger(__name__)
 
+# Retriever fields passed through in addition to a node's connected output fields
+_EXTRA_PREDICTION_FIELDS = ('context', 'passages', 'query', 'sql_query', 'query_description', 'conversation_id')
+
+
+@lru_cache(maxsize=64)
+def _get_lm(model_name: str) -> dspy.LM:
+    """Get the LM for a model, created once per process (provider settings don't change at runtime)"""
+    return create_lm(model_name)
+
+
 class CompoundProgram(dspy.Module):
     """Dynamic compound program that encapsulates the entire workflow"""
 
@@ -28,7 +40,17 @@ class CompoundProgram(dspy.Module):
         self.workflow = workflow
         self.context = context
         self.components = {}
-        self.execution_order, _ = get_execution_order(workflow)
+        self._output_field_names: Dict[str, Tuple[str, ...]] = {}
+        self.execution_order, graph = get_execution_order(workflow)
+        self.execution_levels = get_execution_levels(workflow, graph)
+
+        # Node lookups, incoming edges and start/end nodes are fixed for the workflow, so resolve them once
+        index = get_workflow_index(workflow)
+        self._nodes_by_id = index.nodes_by_id
+        self._input_plans = self._build_input_plans(index.incoming_by_target)
+        self._dependencies = {node_id: list(graph.predecessors(node_id)) for node_id in self.execution_order}
+        self._start_nodes = set(find_start_nodes(workflow))
+        self._end_nodes = find_end_nodes(workflow)
 
         # Identify router nodes and their branch paths
         self.router_node_ids = identify_router_nodes(workflow)
@@ -42,19 +64,35 @@ class CompoundProgram(dspy.Module):
     def _initialize_components(self):
         """Initialize all workflow components as DSPy modules"""
         for node_id in self.execution_order:
-            node = next((n for n in self.workflow.nodes if n.id == node_id), None)
+            node = self._nodes_by_id.get(node_id)
             if not node:
                 continue
 
             # Create template for this node
             template = TemplateFactory.create_template(node, self.workflow)
 
+            # Connected output fields only depend on the workflow, so resolve them once for output extraction
+            self._output_field_names[node_id] = tuple(template._get_connected_fields(is_input=False))
+
             # Initialize component if it has an initialize method
             if hasattr(template, 'initialize'):
                 component = template.initialize(self.context)
                 if component:
                     self.components[node_id] = component
 
+        # Per-node execution plan: (node, node type value, is DSPy module, model name).
+        # These are fixed once initialized, so executing a node needs a single lookup. Components
+        # themselves are still read from self.components, which optimizers copy and update.
+        self._node_plans: Dict[str, Tuple[Any, str, bool, str]] = {
+            node_id: (
+                node,
+                node.type.value,
+                isinstance(self.components.get(node_id), dspy.Module),
+                node.data.get('model', ''),
+            )
+            for node_id, node in self._nodes_by_id.items()
+        }
+
     def forward(self, **inputs):
         """
         Synchronous execution for DSPy optimizers.
@@ -72,63 +110,53 @@ class CompoundProgram(dspy.Module):
                 i += 1
                 continue
 
-            start_time = datetime.now()
-            node = next((n for n in self.workflow.nodes if n.id == node_id), None)
-            if not node:
+            start_ns = time.perf_counter_ns()
+            plan = self._node_plans.get(node_id)
+            if not plan:
                 i += 1
                 continue
+            node, node_type_value, is_dspy_module, model_name = plan
 
             node_inputs = self._get_node_inputs(node_id, inputs)
 
             try:
-                # Check if this is a router node
-                if node_id in self.router_node_ids:
-                    # Execute router to determine branch
-                    if isinstance(self.components[node_id], dspy.primitives.module.Module):
-                        model_name = node.data.get('model', '')
-                        with dspy.context(lm=create_lm(model_name)):
-                            result = self.components[node_id](**node_inputs)
-                    else:
-                        result = self.components[node_id].call(**node_inputs)
-
-                    self._process_node_result(node_id, node, node_inputs, start_time, result)
-                    processed_nodes.add(node_id)
-
-                    # Get selected branch
-                    selected_branch = result.get('branch') if isinstance(result, dict) else getattr(result, 'branch', None)
-
-                    if selected_branch:
-                        # Get nodes in selected branch
-                        branch_nodes = self.router_branch_map[node_id].get(selected_branch, [])
-
-                        # Insert branch nodes into execution path after router
-                        for j, branch_node_id in enumerate(branch_nodes):
-                            execution_path.insert(i + 1 + j, branch_node_id)
-
-                        # Mark all other branch nodes as processed (skip them)
-                        # But don't mark nodes that also appear in the selected branch (merge points)
-                        selected_branch_nodes = set(branch_nodes)
-                        for branch_id, nodes in self.router_branch_map[node_id].items():
-                            if branch_id != selected_branch:
-                                for node_to_skip in nodes:
-                                    # Only mark as processed if NOT in selected branch
-                                    if node_to_skip not in selected_branch_nodes:
-                                        processed_nodes.add(node_to_skip)
+                if is_dspy_module:
+                    with dspy.context(lm=_get_lm(model_name)):
+                        result = self.components[node_id](**node_inputs)
                 else:
-                    # Regular node execution
-                    if isinstance(self.components[node_id], dspy.primitives.module.Module):
-                        model_name = node.data.get('model')
-                        with dspy.context(lm=create_lm(model_name)):
-                            result = self.components[node_id](**node_inputs)
-                    else:
-                        result = self.components[node_id].call(**node_inputs)
-
-                    self._process_node_result(node_id, node, node_inputs, start_time, result)
-                    processed_nodes.add(node_id)
-
+                    result = self.components[node_id].call(**node_inputs)
+                outputs = self._extract_outputs_from_call(result, node)
             except Exception as e:
-                self._handle_node_error(node_id, node, node_inputs, start_time, e)
-                processed_nodes.add(node_id)
+                logger.error(f"Error executing node {node_id}: {e}", exc_info=True)
+                result = None
+                outputs = {'error': str(e)}
+
+            execution_time = (time.perf_counter_ns() - start_ns) / 1e9
+            self.context.set_node_output(node_id, outputs)
+            self.context.add_trace_entry(node_id, node_type_value, node_inputs, outputs, execution_time)
+            processed_nodes.add(node_id)
+
+            # Check if this is a router node that selected a branch
+            if result is not None and node_id in self.router_node_ids:
+                selected_branch = result.get('branch') if isinstance(result, dict) else getattr(result, 'branch', None)
+
+                if selected_branch:
+                    # Get nodes in selected branch
+                    branch_nodes = self.router_branch_map[node_id].get(selected_branch, [])
+
+                    # Insert branch nodes into execution path after router
+                    for j, branch_node_id in enumerate(branch_nodes):
+                        execution_path.insert(i + 1 + j, branch_node_id)
+
+                    # Mark all other branch nodes as processed (skip them)
+                    # But don't mark nodes that also appear in the selected branch (merge points)
+                    selected_branch_nodes = set(branch_nodes)
+                    for branch_id, nodes in self.router_branch_map[node_id].items():
+                        if branch_id != selected_branch:
+                            for node_to_skip in nodes:
+                                # Only mark as processed if NOT in selected branch
+                                if node_to_skip not in selected_branch_nodes:
+                                    processed_nodes.add(node_to_skip)
 
             i += 1
 
@@ -137,94 +165,88 @@ class CompoundProgram(dspy.Module):
     async def aforward(self, **inputs):
         """
         Asynchronous execution for playground/real-time usage.
-        Uses component.acall() methods.
+        Uses component.acall() methods. Nodes on the same execution level don't
+        depend on each other, so each level runs concurrently.
         """
-        # Build execution path considering routers
-        execution_path = self._build_execution_path()
-        processed_nodes = set()
-
-        i = 0
-        while i < len(execution_path):
-            node_id = execution_path[i]
+        all_branch_nodes = self._get_all_branch_nodes()
+        activated_nodes = set()
+        skipped_nodes = set()
+
+        for level in self.execution_levels:
+            # Branch nodes only run once their router has selected them
+            level_nodes = [
+                node_id for node_id in level
+                if node_id not in skipped_nodes
+                and (node_id not in all_branch_nodes or node_id in activated_nodes)
+            ]
+            results = await asyncio.gather(*(self._arun_node(node_id, inputs) for node_id in level_nodes))
+
+            for node_id, result in zip(level_nodes, results):
+                if node_id not in self.router_node_ids or result is None:
+                    continue
+
+                # Get selected branch
+                selected_branch = result.get('branch') if isinstance(result, dict) else getattr(result, 'branch', None)
+
+                if selected_branch:
+                    # Get nodes in selected branch
+                    branch_nodes = self.router_branch_map[node_id].get(selected_branch, [])
+                    activated_nodes.update(branch_nodes)
+
+                    # Skip all other branch nodes
+                    # But don't skip nodes that also appear in the selected branch (merge points)
+                    selected_branch_nodes = set(branch_nodes)
+                    for branch_id, nodes in self.router_branch_map[node_id].items():
+                        if branch_id != selected_branch:
+                            for node_to_skip in nodes:
+                                if node_to_skip not in selected_branch_nodes:
+                                    skipped_nodes.add(node_to_skip)
 
-            if node_id in processed_nodes:
-                i += 1
-                continue
-
-            start_time = datetime.now()
-            node = next((n for n in self.workflow.nodes if n.id == node_id), None)
-            if not node:
-                i += 1
-                continue
-
-            node_inputs = self._get_node_inputs(node_id, inputs)
-
-            try:
-                # Check if this is a router node
-                if node_id in self.router_node_ids:
-                    # Execute router to determine branch
-                    if isinstance(self.components[node_id], dspy.primitives.module.Module):
-                        model_name = node.data.get('model', '')
-                        with dspy.context(lm=create_lm(model_name)):
-                            result = await self.components[node_id].acall(**node_inputs)
-                    else:
-                        result = await self.components[node_id].acall(**node_inputs)
-
-                    self._process_node_result(node_id, node, node_inputs, start_time, result)
-                    processed_nodes.add(node_id)
-
-                    # Get selected branch
-                    selected_branch = result.get('branch') if isinstance(result, dict) else getattr(result, 'branch', None)
-
-                    if selected_branch:
-                        # Get nodes in selected branch
-                        branch_nodes = self.router_branch_map[node_id].get(selected_branch, [])
-
-                        # Insert branch nodes into execution path after router
-                        for j, branch_node_id in enumerate(branch_nodes):
-                            execution_path.insert(i + 1 + j, branch_node_id)
-
-                        # Mark all other branch nodes as processed (skip them)
-                        # But don't mark nodes that also appear in the selected branch (merge points)
-                        selected_branch_nodes = set(branch_nodes)
-                        for branch_id, nodes in self.router_branch_map[node_id].items():
-                            if branch_id != selected_branch:
-                                for node_to_skip in nodes:
-                                    # Only mark as processed if NOT in selected branch
-                                    if node_to_skip not in selected_branch_nodes:
-                                        processed_nodes.add(node_to_skip)
-                else:
-                    # Regular node execution
-                    if isinstance(self.components[node_id], dspy.primitives.module.Module):
-                        model_name = node.data.get('model', '')
-                        # Use model-specific context for DSPy modules
-                        with dspy.context(lm=create_lm(model_name)):
-                            result = await self.components[node_id].acall(**node_inputs)
-                    else:
-                        # Use default LM or no context
-                        result = await self.components[node_id].acall(**node_inputs)
-
-                    self._process_node_result(node_id, node, node_inputs, start_time, result)
-                    processed_nodes.add(node_id)
-
-            except Exception as e:
-                self._handle_node_error(node_id, node, node_inputs, start_time, e)
-                processed_nodes.add(node_id)
+        return self._get_final_outputs()
 
-            i += 1
+    async def _arun_node(self, node_id: str, initial_inputs: Dict[str, Any]) -> Any:
+        """Execute a single node with acall() and record its outputs. Returns None if the node failed."""
+        start_ns = time.perf_counter_ns()
+        plan = self._node_plans.get(node_id)
+        if not plan:
+            return None
+        node, node_type_value, is_dspy_module, model_name = plan
+
+        node_inputs = self._get_node_inputs(node_id, initial_inputs)
+
+        try:
+            if is_dspy_module:
+                # Use model-specific context for DSPy modules
+                with dspy.context(lm=_get_lm(model_name)):
+                    result = await self.components[node_id].acall(**node_inputs)
+            else:
+                # Use default LM or no context
+                result = await self.components[node_id].acall(**node_inputs)
+            outputs = self._extract_outputs_from_call(result, node)
+        except Exception as e:
+            logger.error(f"Error executing node {node_id}: {e}", exc_info=True)
+            result = None
+            outputs = {'error': str(e)}
+
+        execution_time = (time.perf_counter_ns() - start_ns) / 1e9
+        self.context.set_node_output(node_id, outputs)
+        self.context.add_trace_entry(node_id, node_type_value, node_inputs, outputs, execution_time)
+        return result
 
-        return self._get_final_outputs()
+    def _get_all_branch_nodes(self) -> set:
+        """Get all nodes that are in any router branch"""
+        all_branch_nodes = set()
+        for router_id in self.router_node_ids:
+            for branch_id, branch_nodes in self.router_branch_map[router_id].items():
+                all_branch_nodes.update(branch_nodes)
+        return all_branch_nodes
 
     def _build_execution_path(self) -> List[str]:
         """
         Build initial execution path, excluding nodes that are inside router branches.
         Branch nodes will be added dynamically when routers are executed.
         """
-        # Get all nodes that are in any branch
-        all_branch_nodes = set()
-        for router_id in self.router_node_ids:
-            for branch_id, branch_nodes in self.router_branch_map[router_id].items():
-                all_branch_nodes.update(branch_nodes)
+        all_branch_nodes = self._get_all_branch_nodes()
 
         # Build execution path excluding branch nodes
         execution_path = []
@@ -234,65 +256,63 @@ class CompoundProgram(dspy.Module):
 
         return execution_path
 
+    @staticmethod
+    def _build_input_plans(incoming_by_target: Dict[str, List[Any]]) -> Dict[str, List[Tuple[str, Optional[str], Optional[str]]]]:
+        """
+        Resolve each node's incoming edges to (source, source_field, target_field) once.
+        Fields are None for whole-node connections.
+        """
+        plans = {}
+        for target_id, edges in incoming_by_target.items():
+            plan = []
+            for edge in edges:
+                if edge.sourceHandle and edge.targetHandle:
+                    # Field-level connection
+                    plan.append((
+                        edge.source,
+                        edge.sourceHandle.replace('source-', ''),
+                        edge.targetHandle.replace('target-', ''),
+                    ))
+                else:
+                    # Whole-node connection
+                    plan.append((edge.source, None, None))
+            plans[target_id] = plan
+        return plans
+
     def _get_node_inputs(self, node_id: str, initial_inputs: Dict[str, Any]) -> Dict[str, Any]:
         """Get inputs for a node from its dependencies"""
-        dependencies = get_node_dependencies(self.workflow, node_id)
-
         # Check if this is a start node
-        start_nodes = find_start_nodes(self.workflow)
-        if node_id in start_nodes:
+        if node_id in self._start_nodes:
             return initial_inputs
 
-        # Get inputs from previous node outputs
-        inputs = {}
-        incoming_edges = [edge for edge in self.workflow.edges if edge.target == node_id]
+        get_node_output = self.context.get_node_output
+        input_plan = self._input_plans.get(node_id)
 
-        for edge in incoming_edges:
-            source_outputs = self.context.get_node_output(edge.source)
+        # Fallback to legacy behavior: merge all dependency outputs, later ones winning
+        if not input_plan:
+            return {
+                field: value
+                for dep_node_id in self._dependencies.get(node_id, ())
+                for field, value in get_node_output(dep_node_id).items()
+            }
 
-            if edge.sourceHandle and edge.targetHandle:
-                # Field-level connection
-                source_field = edge.sourceHandle.replace('source-', '')
-                target_field = edge.targetHandle.replace('target-', '')
+        # Get inputs from previous node outputs
+        inputs = {}
+        for source_id, source_field, target_field in input_plan:
+            source_outputs = get_node_output(source_id)
 
+            if source_field is not None:
                 if source_field in source_outputs:
                     inputs[target_field] = source_outputs[source_field]
             else:
-                # Whole-node connection
                 inputs.update(source_outputs)
 
-        # Fallback to legacy behavior
-        if not incoming_edges:
-            for dep_node_id in dependencies:
-                dep_outputs = self.context.get_node_output(dep_node_id)
-                inputs.update(dep_outputs)
-
         return inputs
 
-    def _process_node_result(self, node_id: str, node: Any, node_inputs: Dict[str, Any],
-                             start_time: datetime, result: Any) -> Dict[str, Any]:
-        """Process result from node execution (common logic for forward/aforward)"""
-        outputs = self._extract_outputs_from_call(result, node)
-        self.context.set_node_output(node_id, outputs)
-        execution_time = (datetime.now() - start_time).total_seconds()
-        self.context.add_trace_entry(node_id, node.type.value, node_inputs, outputs, execution_time)
-        return outputs
-
-    def _handle_node_error(self, node_id: str, node: Any, node_inputs: Dict[str, Any],
-                          start_time: datetime, error: Exception) -> Dict[str, Any]:
-        """Handle error during node execution (common logic for forward/aforward)"""
-        logger.error(f"Error executing node {node_id}: {error}", exc_info=True)
-        outputs = {'error': str(error)}
-        self.context.set_node_output(node_id, outputs)
-        execution_time = (datetime.now() - start_time).total_seconds()
-        self.context.add_trace_entry(node_id, node.type.value, node_inputs, outputs, execution_time)
-        return outputs
-
     def _get_final_outputs(self) -> dspy.Prediction:
         """Extract final outputs from end nodes (common logic for forward/aforward)"""
-        end_nodes = find_end_nodes(self.workflow)
         final_outputs = {}
-        for end_node_id in end_nodes:
+        for end_node_id in self._end_nodes:
             final_outputs.update(self.context.get_node_output(end_node_id))
         return dspy.Prediction(**final_outputs)
 
@@ -301,33 +321,39 @@ class CompoundProgram(dspy.Module):
         Extract output fields from component call/acall result.
         Handles both DSPy Prediction objects and plain dicts.
         """
+        # Exact type checks cover what components return; subclasses fall back to isinstance
+        result_type = type(result)
+
         # If result is a dict, return as-is (from logic/signature field components)
-        if isinstance(result, dict):
+        if result_type is dict or (result_type is not dspy.Prediction and isinstance(result, dict)):
             return result
 
         # If result is a DSPy Prediction, extract all fields
-        if isinstance(result, dspy.Prediction):
-            outputs = {}
+        if result_type is dspy.Prediction or isinstance(result, dspy.Prediction):
+            return self._extract_prediction_outputs(result, node)
 
-            # Get expected output fields from workflow
-            template = TemplateFactory.create_template(node, self.workflow)
-            output_field_names = template._template._get_connected_fields(is_input=False)
+        # Fallback: convert to dict
+        return {'result': str(result)}
 
-            # Extract expected fields
-            for field_name in output_field_names:
-                if hasattr(result, field_name):
-                    outputs[field_name] = getattr(result, field_name)
+    def _extract_prediction_outputs(self, result: Any, node: Any) -> Dict[str, Any]:
+        """Extract a node's connected output fields plus special fields from a DSPy Prediction"""
+        # Read the prediction's fields once instead of probing attributes one by one
+        fields = dict(result.items())
 
-            # Also extract special fields (rationale for CoT, etc.)
-            if hasattr(result, 'rationale'):
-                outputs['rationale'] = result.rationale
+        # Extract expected fields
+        outputs = {
+            field_name: fields[field_name]
+            for field_name in self._output_field_names[node.id]
+            if field_name in fields
+        }
 
-            # For retrievers, extract additional fields
-            for attr in ['context', 'passages', 'query', 'sql_query', 'query_description', 'conversation_id']:
-                if hasattr(result, attr) and attr not in outputs:
-                    outputs[attr] = getattr(result, attr)
+        # Also extract special fields (rationale for CoT, etc.)
+        if 'rationale' in fields:
+            outputs['rationale'] = fields['rationale']
 
-            return outputs
+        # For retrievers, extract additional fields
+        for attr in _EXTRA_PREDICTION_FIELDS:
+            if attr in fields and attr not in outputs:
+                outputs[attr] = fields[attr]
 
-        # Fallback: convert to dict
-        return {'result': str(result)}
\ No newline at end of file
+        return outputs
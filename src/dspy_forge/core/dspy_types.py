@@ -2,6 +2,7 @@ from typing import Dict, List, Any, Union, Type, get_args, get_origin
 from pydantic import BaseModel
 import dspy
 from enum import Enum
+from functools import lru_cache
 
 
 class DSPyFieldType(str, Enum):
@@ -62,36 +63,39 @@ class LogicDefinition(BaseModel):
     parameters: Dict[str, Any] = {}
 
 
+_PYTHON_TO_DSPY_TYPE = {
+    "str": DSPyFieldType.STRING,
+    "int": DSPyFieldType.INTEGER,
+    "bool": DSPyFieldType.BOOLEAN,
+    "float": DSPyFieldType.FLOAT,
+    "list[str]": DSPyFieldType.LIST_STRING,
+    "list[int]": DSPyFieldType.LIST_INT,
+    "list[float]": DSPyFieldType.LIST_FLOAT,
+    "dict": DSPyFieldType.DICT,
+    "Any": DSPyFieldType.ANY,
+}
+
+_DSPY_TO_PYTHON_TYPE = {
+    DSPyFieldType.STRING: str,
+    DSPyFieldType.INTEGER: int,
+    DSPyFieldType.BOOLEAN: bool,
+    DSPyFieldType.FLOAT: float,
+    DSPyFieldType.LIST_STRING: List[str],
+    DSPyFieldType.LIST_INT: List[int],
+    DSPyFieldType.LIST_FLOAT: List[float],
+    DSPyFieldType.DICT: dict,
+    DSPyFieldType.ANY: Any,
+}
+
+
 def python_type_to_dspy_type(python_type: str) -> DSPyFieldType:
     """Convert Python type string to DSPy field type"""
-    type_mapping = {
-        "str": DSPyFieldType.STRING,
-        "int": DSPyFieldType.INTEGER,
-        "bool": DSPyFieldType.BOOLEAN,
-        "float": DSPyFieldType.FLOAT,
-        "list[str]": DSPyFieldType.LIST_STRING,
-        "list[int]": DSPyFieldType.LIST_INT,
-        "list[float]": DSPyFieldType.LIST_FLOAT,
-        "dict": DSPyFieldType.DICT,
-        "Any": DSPyFieldType.ANY,
-    }
-    return type_mapping.get(python_type, DSPyFieldType.STRING)
+    return _PYTHON_TO_DSPY_TYPE.get(python_type, DSPyFieldType.STRING)
 
 
 def dspy_type_to_python_type(dspy_type: DSPyFieldType) -> Type:
     """Convert DSPy field type to actual Python type"""
-    type_mapping = {
-        DSPyFieldType.STRING: str,
-        DSPyFieldType.INTEGER: int,
-        DSPyFieldType.BOOLEAN: bool,
-        DSPyFieldType.FLOAT: float,
-        DSPyFieldType.LIST_STRING: List[str],
-        DSPyFieldType.LIST_INT: List[int],
-        DSPyFieldType.LIST_FLOAT: List[float],
-        DSPyFieldType.DICT: dict,
-        DSPyFieldType.ANY: Any,
-    }
-    return type_mapping.get(dspy_type, str)
+    return _DSPY_TO_PYTHON_TYPE.get(dspy_type, str)
 
 
 def create_dspy_signature(fields: List[SignatureFieldDefinition], instruction: str = "") -> Type[dspy.Signature]:
@@ -124,9 +128,10 @@ def create_dspy_signature(fields: List[SignatureFieldDefinition], instruction: s
     return signature_class
 
 
-def get_module_class(module_type: DSPyModuleType) -> Type[dspy.Module]:
-    """Get the DSPy module class for a given module type"""
-    module_mapping = {
+@lru_cache(maxsize=1)
+def _module_classes() -> Dict[DSPyModuleType, Type[dspy.Module]]:
+    # Built on first use so a dspy build without one of these attributes only fails when asked for a module class
+    return {
         DSPyModuleType.PREDICT: dspy.Predict,
         DSPyModuleType.CHAIN_OF_THOUGHT: dspy.ChainOfThought,
         DSPyModuleType.REACT: dspy.ReAct,
@@ -134,7 +139,11 @@ def get_module_class(module_type: DSPyModuleType) -> Type[dspy.Module]:
         DSPyModuleType.BEST_OF_N: dspy.majority,  # Note: dspy.majority for BestOfN
         DSPyModuleType.REFINE: dspy.Predict,  # Refine is typically implemented as a custom Predict
     }
-    return module_mapping.get(module_type, dspy.Predict)
+
+
+def get_module_class(module_type: DSPyModuleType) -> Type[dspy.Module]:
+    """Get the DSPy module class for a given module type"""
+    return _module_classes().get(module_type, dspy.Predict)
 
 
 def validate_signature_compatibility(
@@ -155,27 +164,32 @@ def validate_signature_compatibility(
     return True
 
 
+_DEFAULT_PARAMETERS = {
+    DSPyModuleType.PREDICT: {},
+    DSPyModuleType.CHAIN_OF_THOUGHT: {"rationale_type": None},
+    DSPyModuleType.REACT: {"max_iters": 10, "num_results": 3},
+    DSPyModuleType.RETRIEVE: {"k": 5},
+    DSPyModuleType.BEST_OF_N: {"n": 3},
+    DSPyModuleType.REFINE: {"max_iterations": 3},
+}
+
+_LM_REQUIREMENT = {"lm": "Language Model"}
+_REQUIRED_MODELS = {
+    DSPyModuleType.PREDICT: _LM_REQUIREMENT,
+    DSPyModuleType.CHAIN_OF_THOUGHT: _LM_REQUIREMENT,
+    DSPyModuleType.REACT: _LM_REQUIREMENT,
+    DSPyModuleType.RETRIEVE: {"rm": "Retrieval Model"},
+    DSPyModuleType.BEST_OF_N: _LM_REQUIREMENT,
+    DSPyModuleType.REFINE: _LM_REQUIREMENT,
+}
+
+
 def get_default_parameters(module_type: DSPyModuleType) -> Dict[str, Any]:
     """Get default parameters for a DSPy module type"""
-    defaults = {
-        DSPyModuleType.PREDICT: {},
-        DSPyModuleType.CHAIN_OF_THOUGHT: {"rationale_type": None},
-        DSPyModuleType.REACT: {"max_iters": 10, "num_results": 3},
-        DSPyModuleType.RETRIEVE: {"k": 5},
-        DSPyModuleType.BEST_OF_N: {"n": 3},
-        DSPyModuleType.REFINE: {"max_iterations": 3},
-    }
-    return defaults.get(module_type, {})
+    # Return a copy so callers can fill in their own values
+    return dict(_DEFAULT_PARAMETERS.get(module_type, {}))
 
 
 def get_required_models(module_type: DSPyModuleType) -> Dict[str, str]:
     """Get required model types for a DSPy module"""
-    model_requirements = {
-        DSPyModuleType.PREDICT: {"lm": "Language Model"},
-        DSPyModuleType.CHAIN_OF_THOUGHT: {"lm": "Language Model"},
-        DSPyModuleType.REACT: {"lm": "Language Model"},
-        DSPyModuleType.RETRIEVE: {"rm": "Retrieval Model"},
-        DSPyModuleType.BEST_OF_N: {"lm": "Language Model"},
-        DSPyModuleType.REFINE: {"lm": "Language Model"},
-    }
-    return model_requirements.get(module_type, {})
\ No newline at end of file
+    return dict(_REQUIRED_MODELS.get(module_type, {}))
\ No newline at end of file
@@ -6,8 +6,9 @@ for different providers (Databricks, OpenAI, Anthropic, Gemini, custom).
 """
 import dspy
 import os
+from functools import lru_cache
 from typing import Optional, Dict, Any
-from dspy_forge.core.config import settings
+from dspy_forge.core.config import get_settings
 from dspy_forge.core.logging import get_logger
 
 logger = get_logger(__name__)
@@ -22,6 +23,7 @@ class LMProvider:
     CUSTOM = "custom"
 
 
+@lru_cache(maxsize=1024)
 def parse_model_name(model_name: str) -> tuple[str, str]:
     """
     Parse model name to extract provider and actual model name.
@@ -55,6 +57,7 @@ def parse_model_name(model_name: str) -> tuple[str, str]:
 
 def is_databricks_configured() -> bool:
     """Check if Databricks authentication is configured"""
+    settings = get_settings()
     return bool(
         settings.databricks_config_profile or
         (settings.databricks_host and settings.databricks_token) or
@@ -70,6 +73,7 @@ def get_provider_config_status() -> Dict[str, bool]:
     Returns:
         Dictionary mapping provider name to boolean indicating if configured
     """
+    settings = get_settings()
     return {
         LMProvider.DATABRICKS: is_databricks_configured(),
         LMProvider.OPENAI: bool(settings.openai_api_key),
@@ -97,6 +101,7 @@ def create_lm(model_name: str, **kwargs) -> dspy.LM:
         raise ValueError("model_name cannot be empty")
 
     provider, actual_model = parse_model_name(model_name)
+    settings = get_settings()
 
     logger.debug(f"Creating LM for provider='{provider}', model='{actual_model}'")
 
@@ -5,11 +5,132 @@ This module provides the base classes and interfaces that component templates
 must implement to support both execution and code generation.
 """
 
+import weakref
+
 from abc import ABC, abstractmethod
+from dataclasses import dataclass, field
+from functools import lru_cache
 from typing import Dict, Any, List, Optional, Tuple, Literal
 from dspy_forge.models.workflow import NodeType
 
 
+# UI field type -> Python type annotation (as code string)
+_UI_TYPE_ANNOTATIONS = {
+    'str': 'str',
+    'int': 'int',
+    'bool': 'bool',
+    'float': 'float',
+    'list[str]': 'List[str]',
+    'list[int]': 'List[int]',
+    'dict': 'Dict',
+    'list[dict[str, Any]]': 'List[Dict[str, Any]]',
+    'Any': 'Any',
+    'enum': 'str'  # Fallback if no enum values provided
+}
+
+# UI field type -> actual Python type object
+_UI_TYPE_OBJECTS = {
+    'str': str,
+    'int': int,
+    'bool': bool,
+    'float': float,
+    'list[str]': List[str],
+    'list[int]': List[int],
+    'dict': Dict,
+    'list[dict[str, Any]]': List[Dict[str, Any]],
+    'Any': Any,
+    'enum': str  # Fallback if no enum values provided
+}
+
+
+@lru_cache(maxsize=1024)
+def _convert_ui_type_to_python_cached(ui_type: str, enum_values: Tuple[str, ...]) -> str:
+    """Memoized UI type -> Python type annotation string"""
+    if ui_type == 'enum' and enum_values:
+        # Generate Literal type hint for enums
+        formatted_values = ', '.join([f'"{val}"' for val in enum_values])
+        return f'Literal[{formatted_values}]'
+
+    return _UI_TYPE_ANNOTATIONS.get(ui_type, 'str')
+
+
+@lru_cache(maxsize=1024)
+def _convert_ui_type_to_python_actual_cached(ui_type: str, enum_values: Tuple[str, ...]):
+    """Memoized UI type -> actual Python type object"""
+    if ui_type == 'enum' and enum_values:
+        # Generate Literal type for enums
+        return Literal[enum_values]
+
+    return _UI_TYPE_OBJECTS.get(ui_type, str)
+
+
+class WorkflowIndex:
+    """Node and edge lookup tables for a workflow, built in a single pass"""
+
+    __slots__ = ('nodes_by_id', 'incoming_by_target', 'outgoing_by_source')
+
+    def __init__(self, workflow: Any):
+        self.nodes_by_id: Dict[str, Any] = {}
+        self.incoming_by_target: Dict[str, List[Any]] = {}
+        self.outgoing_by_source: Dict[str, List[Any]] = {}
+
+        for node in workflow.nodes:
+            # Keep the first node for a duplicated id, matching a linear scan
+            self.nodes_by_id.setdefault(node.id, node)
+
+        for edge in workflow.edges:
+            self.incoming_by_target.setdefault(edge.target, []).append(edge)
+            self.outgoing_by_source.setdefault(edge.source, []).append(edge)
+
+
+# id(workflow) -> (weakref to workflow, shape when indexed, index)
+_workflow_indexes: Dict[int, Tuple[Any, Tuple[int, int, int, int], WorkflowIndex]] = {}
+
+
+def get_workflow_index(workflow: Any) -> WorkflowIndex:
+    """Get the lookup index for a workflow, rebuilding it if nodes or edges were replaced or resized"""
+    key = id(workflow)
+    shape = (id(workflow.nodes), len(workflow.nodes), id(workflow.edges), len(workflow.edges))
+
+    entry = _workflow_indexes.get(key)
+    if entry is not None and entry[0]() is workflow and entry[1] == shape:
+        return entry[2]
+
+    index = WorkflowIndex(workflow)
+    try:
+        # Workflow models are unhashable, so key by id and drop the entry when the workflow is collected
+        ref = weakref.ref(workflow, lambda _, key=key: _workflow_indexes.pop(key, None))
+    except TypeError:
+        return index
+
+    _workflow_indexes[key] = (ref, shape, index)
+    return index
+
+
+@dataclass(slots=True)
+class GeneratedCode:
+    """Code fragments generated for a single node
+
+    Supports item access and get() so callers written against the former dict return value keep working.
+    """
+    signature: str = ''
+    instance: str = ''
+    forward: str = ''
+    dependencies: List[str] = field(default_factory=list)
+    instance_var: str = ''
+    signature_name: str = ''
+    class_definition: str = ''
+
+    def __getitem__(self, key: str) -> Any:
+        try:
+            return getattr(self, key)
+        except AttributeError:
+            raise KeyError(key) from None
+
+    def get(self, key: str, default: Any = None) -> Any:
+        return getattr(self, key, default)
+
+
 class CodeGenerationContext:
     """Context for code generation tracking"""
 
@@ -18,18 +139,21 @@ class CodeGenerationContext:
         self.node_counts = {}
         self.result_count = 0
         self.signature_names = {}
+        self.signature_type_counts = {}  # Maps module type -> number of signatures created for it
         self.node_to_var_mapping = {}  # Maps node_id -> instance_var for optimization loading
     
     def get_signature_name(self, signature_key: tuple) -> str:
         """Get or create unique signature name"""
-        if signature_key not in self.signature_names:
+        signature_name = self.signature_names.get(signature_key)
+        if signature_name is None:
             module_type_str = signature_key[0]
-            existing_count = len([s for s in self.signatures_created if s[0] == module_type_str])
+            existing_count = self.signature_type_counts.get(module_type_str, 0)
             signature_name = f"{module_type_str}Signature_{existing_count + 1}"
+            self.signature_type_counts[module_type_str] = existing_count + 1
             self.signature_names[signature_key] = signature_name
             self.signatures_created.add(signature_key)
         
-        return self.signature_names[signature_key]
+        return signature_name
     
     def get_node_count(self, node_type: str) -> int:
         """Get and increment node count"""
@@ -44,6 +168,11 @@ class CodeGenerationContext:
 
 class NodeTemplate(ABC):
     """Base template class for workflow nodes"""
+
+    __slots__ = (
+        'node', 'workflow', 'node_id', 'node_type', 'node_data',
+        '_connected_fields_cache', '_field_info_cache'
+    )
     
     def __init__(self, node: Any, workflow: Any):
         self.node = node
@@ -51,6 +180,9 @@ class NodeTemplate(ABC):
         self.node_id = node.id
         self.node_type = node.type
         self.node_data = node.data
+        # Per-instance memo of graph lookups; the workflow is fixed for a template's lifetime
+        self._connected_fields_cache: Dict[bool, List[str]] = {}
+        self._field_info_cache: Dict[Tuple[str, bool], Tuple[str, str, Optional[List[str]]]] = {}
     
     @abstractmethod
     def initialize(self, context: Any) -> Optional[Any]:
@@ -71,34 +203,43 @@ class NodeTemplate(ABC):
         pass
     
     @abstractmethod
-    def generate_code(self, context: CodeGenerationContext) -> Dict[str, Any]:
+    def generate_code(self, context: CodeGenerationContext) -> GeneratedCode:
         """Generate code for this node
         
         Args:
             context: Code generation context for tracking state
             
         Returns:
-            Dict containing:
-            - 'signature': Signature class code (if needed)
-            - 'instance': Instance creation code
-            - 'forward': Forward method code
-            - 'dependencies': Required imports/dependencies
-            - 'instance_var': Variable name for this instance
+            GeneratedCode containing:
+            - signature: Signature class code (if needed)
+            - instance: Instance creation code
+            - forward: Forward method code
+            - dependencies: Required imports/dependencies
+            - instance_var: Variable name for this instance
+            - signature_name / class_definition: set only by templates that emit them
         """
         pass
     
     def _get_connected_fields(self, is_input: bool = True) -> List[str]:
-        """Get field names from connected signature field nodes and field selector logic nodes"""
+        """Get field names from connected signature field nodes and field selector logic nodes (memoized)"""
+        fields = self._connected_fields_cache.get(is_input)
+        if fields is None:
+            fields = self._connected_fields_cache[is_input] = self._collect_connected_fields(is_input)
+        return fields
+
+    def _collect_connected_fields(self, is_input: bool = True) -> List[str]:
+        """Collect field names from connected signature field nodes and field selector logic nodes"""
         fields = []
+        index = get_workflow_index(self.workflow)
 
         if is_input:
-            edges = [edge for edge in self.workflow.edges if edge.target == self.node_id]
+            edges = index.incoming_by_target.get(self.node_id, ())
         else:
-            edges = [edge for edge in self.workflow.edges if edge.source == self.node_id]
+            edges = index.outgoing_by_source.get(self.node_id, ())
 
         for edge in edges:
             node_id = edge.source if is_input else edge.target
-            node = next((n for n in self.workflow.nodes if n.id == node_id), None)
+            node = index.nodes_by_id.get(node_id)
 
             if node and node.type == NodeType.SIGNATURE_FIELD:
                 node_fields = node.data.get('fields', [])
@@ -123,15 +264,25 @@ class NodeTemplate(ABC):
         return fields
     
     def _get_field_info(self, field_name: str, is_input: bool = True) -> Tuple[str, str, Optional[List[str]]]:
+        """Get field type, description, and enum values for a connected field (memoized)"""
+        key = (field_name, is_input)
+        info = self._field_info_cache.get(key)
+        if info is None:
+            info = self._field_info_cache[key] = self._resolve_field_info(field_name, is_input)
+        return info
+
+    def _resolve_field_info(self, field_name: str, is_input: bool = True) -> Tuple[str, str, Optional[List[str]]]:
         """Get field type, description, and enum values from connected signature field nodes and field selector logic nodes"""
+        index = get_workflow_index(self.workflow)
+
         if is_input:
-            edges = [edge for edge in self.workflow.edges if edge.target == self.node_id]
+            edges = index.incoming_by_target.get(self.node_id, ())
         else:
-            edges = [edge for edge in self.workflow.edges if edge.source == self.node_id]
+            edges = index.outgoing_by_source.get(self.node_id, ())
 
         for edge in edges:
             node_id = edge.source if is_input else edge.target
-            node = next((n for n in self.workflow.nodes if n.id == node_id), None)
+            node = index.nodes_by_id.get(node_id)
 
             if node and node.type == NodeType.SIGNATURE_FIELD:
                 fields = node.data.get('fields', [])
@@ -167,10 +318,11 @@ class NodeTemplate(ABC):
     def _trace_field_info_upstream(self, field_selector_node_id: str, original_field_name: str) -> Tuple[str, str, Optional[List[str]]]:
         """Trace upstream from field selector to find original field type, description, and enum values"""
         # Find edges coming into the field selector node
-        upstream_edges = [edge for edge in self.workflow.edges if edge.target == field_selector_node_id]
+        index = get_workflow_index(self.workflow)
+        upstream_edges = index.incoming_by_target.get(field_selector_node_id, ())
 
         for edge in upstream_edges:
-            upstream_node = next((n for n in self.workflow.nodes if n.id == edge.source), None)
+            upstream_node = index.nodes_by_id.get(edge.source)
 
             if upstream_node and upstream_node.type == NodeType.SIGNATURE_FIELD:
                 fields = upstream_node.data.get('fields', [])
@@ -200,44 +352,11 @@ class NodeTemplate(ABC):
 
     def _convert_ui_type_to_python(self, ui_type: str, enum_values: Optional[List[str]] = None) -> str:
         """Convert UI field type to Python type annotation"""
-        if ui_type == 'enum' and enum_values:
-            # Generate Literal type hint for enums
-            formatted_values = ', '.join([f'"{val}"' for val in enum_values])
-            return f'Literal[{formatted_values}]'
-
-        type_mapping = {
-            'str': 'str',
-            'int': 'int',
-            'bool': 'bool',
-            'float': 'float',
-            'list[str]': 'List[str]',
-            'list[int]': 'List[int]',
-            'dict': 'Dict',
-            'list[dict[str, Any]]': 'List[Dict[str, Any]]',
-            'Any': 'Any',
-            'enum': 'str'  # Fallback if no enum values provided
-        }
-        return type_mapping.get(ui_type, 'str')
+        return _convert_ui_type_to_python_cached(ui_type, tuple(enum_values or ()))
     
     def _convert_ui_type_to_python_actual(self, ui_type: str, enum_values=None):
         """Convert UI field type to actual Python type object (not string)"""
-        if ui_type == 'enum' and enum_values:
-            # Generate Literal type for enums
-            return Literal[tuple(enum_values)]
-        
-        type_mapping = {
-            'str': str,
-            'int': int,
-            'bool': bool,
-            'float': float,
-            'list[str]': List[str],
-            'list[int]': List[int],
-            'dict': Dict,
-            'list[dict[str, Any]]': List[Dict[str, Any]],
-            'Any': Any,
-            'enum': str  # Fallback if no enum values provided
-        }
-        return type_mapping.get(ui_type, str)
+        return _convert_ui_type_to_python_actual_cached(ui_type, tuple(enum_values or ()))
 
 
 class TemplateFactory:
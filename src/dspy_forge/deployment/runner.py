@@ -10,7 +10,7 @@ from mlflow.models.resources import DatabricksServingEndpoint
 from databricks import agents
 from databricks.sdk import WorkspaceClient
 
-from dspy_forge.core.config import settings
+from dspy_forge.core.config import get_settings
 from dspy_forge.core.logging import get_logger
 
 logger = get_logger(__name__)
@@ -25,6 +25,8 @@ def deploy_agent(
         auth_policy: tuple[list[Any], list[Any]],
         program_json_path: Optional[str] = None
     ):
+    # Make sure MLflow/Databricks auth is configured before talking to the workspace
+    get_settings()
     w = WorkspaceClient()
     current_user = w.current_user.me().user_name
 
@@ -8,10 +8,12 @@ from fastapi.middleware.cors import CORSMiddleware
 from fastapi.staticfiles import StaticFiles
 from fastapi.responses import FileResponse
 
-from dspy_forge.core.config import settings
+from dspy_forge.core.config import get_settings
 from dspy_forge.core.logging import setup_logging, get_logger
 from dspy_forge.api.routes import router as api_router
 
+settings = get_settings()
+
 # Initialize logging
 setup_logging(
     level=settings.log_level,
@@ -1,3 +1,5 @@
+import re
+
 from typing import Dict, Any, List, Tuple
 from datetime import datetime
 
@@ -10,11 +12,15 @@ from dspy_forge.utils.workflow_utils import (
     get_branch_paths,
     find_branch_merge_point
 )
-from dspy_forge.core.templates import TemplateFactory, CodeGenerationContext
+from dspy_forge.core.templates import TemplateFactory, CodeGenerationContext, GeneratedCode, get_workflow_index
 from dspy_forge.components import registry  # This will auto-register all templates
+from dspy_forge.components.logic_templates import RouterTemplate
 
 logger = get_logger(__name__)
 
+# Start of every line that has non-whitespace content; used to nest branch code one level deeper
+_NON_BLANK_LINE_START = re.compile(r'^(?=.*\S)', re.MULTILINE)
+
 
 class WorkflowCompilerService:
     """Service for compiling workflows to optimized DSPy code"""
@@ -125,9 +131,10 @@ class WorkflowCompilerService:
 
             # First pass: collect all non-branch node code
             node_code_map = {}  # Map node_id -> generated code
+            nodes_by_id = get_workflow_index(workflow).nodes_by_id
 
             for node_id in execution_order:
-                node = next((n for n in workflow.nodes if n.id == node_id), None)
+                node = nodes_by_id.get(node_id)
                 if not node:
                     continue
 
@@ -139,24 +146,24 @@ class WorkflowCompilerService:
                 node_code_map[node_id] = node_code
 
                 # Collect code components (except forward - handled separately)
-                if node_code.get('class_definition'):
-                    class_definitions.append(node_code['class_definition'])
+                if node_code.class_definition:
+                    class_definitions.append(node_code.class_definition)
 
-                if node_code.get('signature'):
-                    signatures.append(node_code['signature'])
+                if node_code.signature:
+                    signatures.append(node_code.signature)
 
-                if node_code.get('instance'):
-                    instances.append(node_code['instance'])
+                if node_code.instance:
+                    instances.append(node_code.instance)
 
-                if node_code.get('instance_var'):
-                    instance_vars.append(node_code['instance_var'])
+                if node_code.instance_var:
+                    instance_vars.append(node_code.instance_var)
 
             # Second pass: generate forward method with router branching
             for node_id in execution_order:
                 if node_id in processed_nodes:
                     continue
 
-                node = next((n for n in workflow.nodes if n.id == node_id), None)
+                node = nodes_by_id.get(node_id)
                 if not node:
                     continue
 
@@ -175,9 +182,9 @@ class WorkflowCompilerService:
                     processed_nodes.add(node_id)
                 else:
                     # Regular node - add its forward code
-                    node_code = node_code_map.get(node_id, {})
-                    if node_code.get('forward'):
-                        forward_code_blocks.append(node_code['forward'])
+                    node_code = node_code_map.get(node_id)
+                    if node_code and node_code.forward:
+                        forward_code_blocks.append(node_code.forward)
                     processed_nodes.add(node_id)
             
             # Generate class definitions
@@ -320,7 +327,7 @@ class WorkflowCompilerService:
         workflow: Workflow,
         router_node: Any,
         branch_paths: Dict[str, List[str]],
-        node_code_map: Dict[str, Dict[str, Any]],
+        node_code_map: Dict[str, GeneratedCode],
         context: CodeGenerationContext
     ) -> str:
         """
@@ -330,14 +337,12 @@ class WorkflowCompilerService:
             workflow: The workflow
             router_node: The router node
             branch_paths: Dict mapping branch_id to list of node IDs in that branch
-            node_code_map: Map of node_id to generated code dict
+            node_code_map: Map of node_id to generated code
             context: Code generation context
 
         Returns:
             Generated if-elif-else code block as string
         """
-        from dspy_forge.components.logic_templates import RouterTemplate
-
         # Get router configuration
         router_config = router_node.data.get('router_config') or router_node.data.get('routerConfig', {})
         branches = router_config.get('branches', [])
@@ -379,16 +384,7 @@ class WorkflowCompilerService:
             # Add code for nodes in this branch
             branch_node_ids = branch_paths.get(branch_id, [])
             if branch_node_ids:
-                for node_id in branch_node_ids:
-                    node_code = node_code_map.get(node_id, {})
-                    forward_code = node_code.get('forward', '')
-                    if forward_code:
-                        # Indent the forward code (add 4 more spaces)
-                        indented_code = '\n'.join(
-                            '    ' + line if line.strip() else line
-                            for line in forward_code.split('\n')
-                        )
-                        code_lines.append(indented_code)
+                code_lines.extend(self._indent_branch_forward_code(branch_node_ids, node_code_map))
             else:
                 code_lines.append("            pass  # No nodes in this branch")
 
@@ -399,22 +395,18 @@ class WorkflowCompilerService:
             branch_node_ids = branch_paths.get(branch_id, [])
 
             if branch_node_ids:
-                for node_id in branch_node_ids:
-                    node_code = node_code_map.get(node_id, {})
-                    forward_code = node_code.get('forward', '')
-                    if forward_code:
-                        # Indent the forward code (add 4 more spaces)
-                        indented_code = '\n'.join(
-                            '    ' + line if line.strip() else line
-                            for line in forward_code.split('\n')
-                        )
-                        code_lines.append(indented_code)
+                code_lines.extend(self._indent_branch_forward_code(branch_node_ids, node_code_map))
             else:
                 code_lines.append("            pass  # No nodes in default branch")
 
         code_lines.append("")
 
         return '\n'.join(code_lines)
+
+    def _indent_branch_forward_code(self, branch_node_ids: List[str], node_code_map: Dict[str, GeneratedCode]) -> List[str]:
+        """Indent the forward code of each branch node by one level so it nests under its if/elif/else"""
+        forward_blocks = (node_code_map[node_id].forward for node_id in branch_node_ids if node_id in node_code_map)
+        return [_NON_BLANK_LINE_START.sub('    ', forward_code) for forward_code in forward_blocks if forward_code]
     
 
 
@@ -6,21 +6,11 @@ from datetime import datetime
 from typing import Dict, Any, List, Optional
 from pathlib import Path
 
-from mlflow.models.resources import (
-    DatabricksFunction,
-    DatabricksGenieSpace,
-    DatabricksSQLWarehouse,
-    DatabricksTable,
-    DatabricksServingEndpoint,
-    DatabricksVectorSearchIndex,
-)
-
 from dspy_forge.models.workflow import Workflow, NodeType
 from dspy_forge.services.validation_service import validation_service
 from dspy_forge.services.compiler_service import compiler_service
 from dspy_forge.storage.factory import get_storage_backend
 from dspy_forge.core.logging import get_logger
-from dspy_forge.deployment.runner import deploy_agent
 
 logger = get_logger(__name__)
 
@@ -221,7 +211,8 @@ class DeploymentService:
             agent_file_path = await self._get_local_file_path(storage, f"workflows/{workflow.id}/agent.py")
             program_file_path = await self._get_local_file_path(storage, f"workflows/{workflow.id}/program.py")
 
-            # Call the deployment
+            # Call the deployment (the runner pulls in mlflow and databricks-agents, so import on use)
+            from dspy_forge.deployment.runner import deploy_agent
             deployment_info = deploy_agent(
                 workflow_id=workflow.id,
                 agent_file_path=agent_file_path,
@@ -273,6 +264,12 @@ class DeploymentService:
     
     def _generate_resource_list(self, workflow: Workflow) -> List[Dict[str, Any]]:
         """Generate list of resources based on workflow components"""
+        from mlflow.models.resources import (
+            DatabricksGenieSpace,
+            DatabricksServingEndpoint,
+            DatabricksVectorSearchIndex,
+        )
+
         user_resource_scopes = []
         system_resources = []
         
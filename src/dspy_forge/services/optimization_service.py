@@ -7,11 +7,9 @@ import shutil
 from datetime import datetime
 from typing import Dict, Any, List, Optional
 
-from databricks import sql
-from databricks.sdk import WorkspaceClient
 from dspy import GEPA, BootstrapFewShotWithRandomSearch, MIPROv2
 
-from dspy_forge.core.config import settings
+from dspy_forge.core.config import get_settings
 from dspy_forge.core.logging import get_logger
 from dspy_forge.core.lm_config import create_lm
 from dspy_forge.models.workflow import Workflow
@@ -60,6 +58,7 @@ class OptimizationService:
         logger.info(f"Loading dataset from {table_name}")
 
         # Check if warehouse ID is configured
+        settings = get_settings()
         if not settings.databricks_warehouse_id:
             error_msg = (
                 "DATABRICKS_WAREHOUSE_ID is not configured. "
@@ -70,6 +69,9 @@ class OptimizationService:
 
         def _load_data_sync():
             """Synchronous function to load data from UC table"""
+            from databricks import sql
+            from databricks.sdk import WorkspaceClient
+
             try:
                 # Get Databricks connection parameters
                 w = WorkspaceClient()
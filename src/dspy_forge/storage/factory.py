@@ -3,7 +3,7 @@ from typing import Optional
 from dspy_forge.storage.base import StorageBackend
 from dspy_forge.storage.local import LocalDirectoryStorage
 from dspy_forge.storage.databricks import DatabricksVolumeStorage
-from dspy_forge.core.config import settings
+from dspy_forge.core.config import get_settings
 from dspy_forge.core.logging import get_logger
 
 
@@ -25,7 +25,7 @@ class StorageBackendFactory:
             ValueError: If storage backend configuration is invalid
             RuntimeError: If storage backend initialization fails
         """
-        backend_type = settings.storage_backend.lower()
+        backend_type = get_settings().storage_backend.lower()
         
         logger.info(f"Creating storage backend: {backend_type}")
         
@@ -39,14 +39,14 @@ class StorageBackendFactory:
     @staticmethod
     def _create_local_storage() -> LocalDirectoryStorage:
         """Create local directory storage backend"""
-        storage_path = settings.artifacts_path
+        storage_path = get_settings().artifacts_path
         logger.debug(f"Creating local storage with path: {storage_path}")
         return LocalDirectoryStorage(storage_path)
     
     @staticmethod
     def _create_databricks_storage() -> DatabricksVolumeStorage:
         """Create Databricks volume storage backend"""
-        volume_path = settings.artifacts_path
+        volume_path = get_settings().artifacts_path
         
         if not volume_path:
             raise ValueError(
@@ -1,4 +1,4 @@
-from typing import Dict, List
+from typing import Dict, List, Optional
 import networkx as nx
 
 from dspy_forge.models.workflow import Workflow, NodeType
@@ -43,6 +43,20 @@ def get_execution_order(workflow: Workflow) -> List[str]:
         raise WorkflowValidationError(f"Cannot determine execution order: {e}")
 
 
+def get_execution_levels(workflow: Workflow, graph: Optional[nx.DiGraph] = None) -> List[List[str]]:
+    """
+    Group nodes into levels where each node only depends on nodes in earlier levels.
+    Pass the graph from get_execution_order to avoid building it again.
+    """
+    if graph is None:
+        graph = build_workflow_graph(workflow)
+
+    try:
+        return [list(level) for level in nx.topological_generations(graph)]
+    except nx.NetworkXError as e:
+        raise WorkflowValidationError(f"Cannot determine execution order: {e}")
+
+
 def get_node_dependencies(workflow: Workflow, node_id: str) -> List[str]:
     """Get list of node IDs that this node depends on"""
     graph = build_workflow_graph(workflow)